@@ -6,9 +6,12 @@ Rust core functions are available directly:
 
 from .rusty_rag_core import (
     extract_pdf_text,
+    extract_pdf_text_bytes,
+    extract_and_chunk,
     chunk_text_parallel,
     chunk_text,
     chunk_by_tokens,
+    chunk_by_tokens_with_counts,
     tokenize,
     token_count,
     BM25Index,
@@ -16,9 +19,12 @@ from .rusty_rag_core import (
 
 __all__ = [
     "extract_pdf_text",
+    "extract_pdf_text_bytes",
+    "extract_and_chunk",
     "chunk_text_parallel",
     "chunk_text",
     "chunk_by_tokens",
+    "chunk_by_tokens_with_counts",
     "tokenize",
     "token_count",
     "BM25Index",
@@ -1,16 +1,21 @@
 """RustyRAG CLI — Chat with your local PDF documents using RAG."""
 
 import click
-from dotenv import load_dotenv
-from rich.console import Console
-from rich.panel import Panel
 
-console = Console()
+# Rich, dotenv and the RAG stack are imported inside the commands that use
+# them, keeping `rusty-rag --help` and quiet invocations fast to start.
 
 
 @click.group()
 @click.version_option(version="0.1.0")
-def main():
+@click.option(
+    "--verbose/--quiet",
+    "-v/-q",
+    default=True,
+    help="Show pipeline progress (default) or only print results.",
+)
+@click.pass_context
+def main(ctx: click.Context, verbose: bool):
     """RustyRAG — Chat with your local PDF documents using RAG.
 
     Powered by Ollama (local LLM) and Qdrant (vector database).
@@ -19,44 +24,68 @@ def main():
     Performance-critical operations (PDF parsing, text chunking) run in Rust.
     High-level orchestration (embeddings, LLM, vector search) runs in Python.
     """
+    from dotenv import load_dotenv
+
     load_dotenv()
+    ctx.obj = verbose
 
 
 @main.command()
 @click.argument("file_path", type=click.Path(exists=True))
-def ingest(file_path: str):
+@click.pass_obj
+def ingest(verbose: bool, file_path: str):
     """Ingest a PDF file into the knowledge base.
 
     Extracts text from the PDF, splits it into semantic chunks,
     generates embeddings, and stores everything in Qdrant.
     """
-    from .rag import ingest as do_ingest
+    from .rag import ingest as do_ingest, set_verbose
 
+    set_verbose(verbose)
     try:
         do_ingest(file_path)
     except Exception as e:
-        console.print(f"\n[bold red]❌ Error:[/bold red] {e}")
-        raise SystemExit(1)
+        _error(verbose, e)
 
 
 @main.command()
 @click.argument("question")
-def query(question: str):
+@click.pass_obj
+def query(verbose: bool, question: str):
     """Query the knowledge base with a question.
 
     Searches for relevant chunks in the vector database,
     then uses the LLM to generate an answer based on the context.
     """
-    from .rag import query as do_query
+    from .rag import query as do_query, set_verbose
 
+    set_verbose(verbose)
     try:
         response = do_query(question)
+    except Exception as e:
+        _error(verbose, e)
+
+    if verbose:
+        from rich.console import Console
+        from rich.panel import Panel
+
+        console = Console()
         console.print()
         console.print(Panel(response, title="📝 Answer", border_style="green"))
         console.print()
-    except Exception as e:
-        console.print(f"\n[bold red]❌ Error:[/bold red] {e}")
-        raise SystemExit(1)
+    else:
+        click.echo(response)
+
+
+def _error(verbose: bool, e: Exception):
+    """Report a failed command and exit with status 1."""
+    if verbose:
+        from rich.console import Console
+
+        Console().print(f"\n[bold red]❌ Error:[/bold red] {e}")
+    else:
+        click.echo(f"Error: {e}", err=True)
+    raise SystemExit(1)
 
 
 if __name__ == "__main__":
@@ -1,21 +1,88 @@
 """Ollama embedding generation."""
 
+import functools
 import os
-import ollama
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 
-def embed_texts(texts: list[str], model: str | None = None) -> list[list[float]]:
+from .ollama_client import get_client
+
+
+def _embed_settings() -> tuple[int, int]:
+    """Return `OLLAMA_EMBED_BATCH` and `OLLAMA_EMBED_WORKERS`, each at least 1."""
+    batch_size = max(1, int(os.getenv("OLLAMA_EMBED_BATCH", "32")))
+    workers = max(1, int(os.getenv("OLLAMA_EMBED_WORKERS", "4")))
+    return batch_size, workers
+
+
+def embed_capacity() -> int:
+    """Number of texts one `embed_texts` call can keep in flight at once.
+
+    This is the sub-batch size times the worker count. A caller that feeds
+    chunks in batches of this size gives every worker a request.
+    """
+    batch_size, workers = _embed_settings()
+    return batch_size * workers
+
+
+def embed_texts(texts: list[str], model: str | None = None) -> np.ndarray:
     """Generate embedding vectors for a batch of text chunks.
 
-    Uses Ollama's embedding API with batch support for efficiency.
+    Ollama embeds the items of a single request one after another, so the
+    input is split into sub-batches of `OLLAMA_EMBED_BATCH` texts that are
+    sent concurrently over up to `OLLAMA_EMBED_WORKERS` connections.
+    Vectors are returned as rows of a float32 array, in the same order as
+    `texts`.
     """
     model = model or os.getenv("EMBEDDING_MODEL", "all-minilm")
-    response = ollama.embed(model=model, input=texts)
-    return response["embeddings"]
+    batch_size, workers = _embed_settings()
+
+    batches = [texts[i : i + batch_size] for i in range(0, len(texts), batch_size)]
+    if len(batches) <= 1:
+        return _embed_batch(texts, model)
+
+    with ThreadPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+        results = pool.map(lambda batch: _embed_batch(batch, model), batches)
+        return np.concatenate(list(results))
 
 
-def embed_query(query: str, model: str | None = None) -> list[float]:
-    """Generate a single embedding vector for a query string."""
+def _embed_batch(texts: list[str], model: str) -> np.ndarray:
+    """Embed one sub-batch, splitting it in half on timeouts or server errors.
+
+    Smaller requests finish well within the client timeout, so an overloaded
+    server degrades to more, shorter requests instead of failing the ingest.
+    """
+    import httpx
+    import ollama
+
+    try:
+        response = get_client().embed(model=model, input=texts)
+    except (httpx.TimeoutException, ollama.ResponseError) as e:
+        retryable = isinstance(e, httpx.TimeoutException) or e.status_code >= 500
+        if not retryable or len(texts) <= 1:
+            raise
+        mid = len(texts) // 2
+        return np.concatenate(
+            [_embed_batch(texts[:mid], model), _embed_batch(texts[mid:], model)]
+        )
+    return np.asarray(response["embeddings"], dtype=np.float32)
+
+
+def embed_query(query: str, model: str | None = None) -> np.ndarray:
+    """Generate a single float32 embedding vector for a query string.
+
+    Vectors are memoized per (model, query), so repeating a question in the
+    same process skips the Ollama round trip. The returned array is shared
+    with the cache and therefore read-only.
+    """
     model = model or os.getenv("EMBEDDING_MODEL", "all-minilm")
-    response = ollama.embed(model=model, input=query)
-    return response["embeddings"][0]
+    return _embed_query_cached(model, query)
+
+
+@functools.lru_cache(maxsize=512)
+def _embed_query_cached(model: str, query: str) -> np.ndarray:
+    response = get_client().embed(model=model, input=query)
+    vector = np.asarray(response["embeddings"][0], dtype=np.float32)
+    vector.flags.writeable = False
+    return vector
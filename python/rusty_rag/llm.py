@@ -1,7 +1,8 @@
 """Ollama LLM completion with context-aware prompting."""
 
 import os
-import ollama
+
+from .ollama_client import get_client
 
 
 def ask(question: str, context: str = "", model: str | None = None) -> str:
@@ -23,7 +24,7 @@ def ask(question: str, context: str = "", model: str | None = None) -> str:
     else:
         system = "You are a helpful assistant."
 
-    response = ollama.chat(
+    response = get_client().chat(
         model=model,
         messages=[
             {"role": "system", "content": system},
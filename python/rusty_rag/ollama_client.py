@@ -0,0 +1,30 @@
+"""Shared Ollama HTTP client."""
+
+from __future__ import annotations
+
+import functools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    import ollama
+
+# Generous timeout: first requests may block while Ollama loads the model
+TIMEOUT = 300.0
+
+
+@functools.lru_cache(maxsize=None)
+def get_client() -> ollama.Client:
+    """Return the process-wide Ollama client.
+
+    A single client keeps its HTTP connections alive between calls, so
+    embedding batches and chat requests reuse the same pooled sockets
+    instead of reconnecting. The host is read from `OLLAMA_HOST` by the
+    client itself on first use.
+    """
+    import httpx
+    import ollama
+
+    return ollama.Client(
+        timeout=TIMEOUT,
+        limits=httpx.Limits(max_keepalive_connections=40, keepalive_expiry=30),
+    )
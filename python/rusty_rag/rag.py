@@ -4,118 +4,243 @@ Uses hybrid retrieval (vector similarity + BM25 keyword matching) for
 higher quality results than either method alone.
 """
 
-import json
+from __future__ import annotations
+
 import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from rich.console import Console
+import numpy as np
 
-from . import extract_pdf_text, chunk_by_tokens, BM25Index
-from .embeddings import embed_texts, embed_query
+from . import extract_and_chunk, tokenize, BM25Index
+from .embeddings import embed_capacity, embed_texts, embed_query
 from .llm import ask
-from .db import create_client, init_collection, upsert_chunks, search
+from .db import (
+    create_client,
+    delete_chunks,
+    delete_legacy_points,
+    init_collection,
+    upsert_chunks,
+    search,
+)
+from .store import ChunkStore
+
+if TYPE_CHECKING:
+    from qdrant_client import QdrantClient
+
+
+def _quiet(*args, **kwargs) -> None:
+    """Default progress logger: discard all output."""
+
+
+# Progress logger; Rich is only imported once verbose output is enabled
+_log = _quiet
+
 
-console = Console()
+def set_verbose(verbose: bool) -> None:
+    """Enable or disable Rich progress output from `ingest` and `query`."""
+    global _log
+    if verbose:
+        from rich.console import Console
 
-# Local cache for BM25 index (chunks stored on disk between sessions)
+        _log = Console().print
+    else:
+        _log = _quiet
+
+
+# Local cache for BM25 (chunk texts + index stored on disk between sessions)
 CACHE_DIR = Path.home() / ".rusty_rag"
-CHUNK_CACHE = CACHE_DIR / "chunks.json"
+BM25_INDEX = CACHE_DIR / "bm25.idx"
+
+# Chunk cache written by earlier versions, removed on first use
+LEGACY_JSON_CACHE = CACHE_DIR / "chunks.json"
+
+# Header + text of one retrieved chunk in the LLM context (bound once)
+_format_chunk = "[Chunk {} | Score: {:.3f}]\n{}".format
 
 
-def _load_chunk_cache() -> list[str]:
-    """Load cached chunks from disk for BM25 indexing."""
-    if CHUNK_CACHE.exists():
-        with open(CHUNK_CACHE, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+def _drop_legacy_cache(client: QdrantClient) -> None:
+    """Remove the chunk cache and vectors written by versions before the store.
+
+    Those chunks don't record which document they came from, so a later
+    ingest could never replace them and they would be retrieved next to the
+    re-ingested copies. Their points (the ones without a `chunk_id`) are
+    deleted along with `chunks.json`; the documents need to be ingested again.
+    """
+    if not LEGACY_JSON_CACHE.exists():
+        return
+    delete_legacy_points(client)
+    LEGACY_JSON_CACHE.unlink()
+    _log(
+        "  [yellow]Removed the chunk cache of an older RustyRAG version; "
+        "please re-ingest your documents.[/yellow]"
+    )
+
 
+def _save_bm25_index(store: ChunkStore) -> None:
+    """Build the BM25 index over the live chunks and persist it to disk.
 
-def _save_chunk_cache(chunks: list[str]) -> None:
-    """Append new chunks to the local cache."""
-    CACHE_DIR.mkdir(parents=True, exist_ok=True)
-    existing = _load_chunk_cache()
-    existing.extend(chunks)
-    with open(CHUNK_CACHE, "w", encoding="utf-8") as f:
-        json.dump(existing, f, ensure_ascii=False)
+    Tombstoned chunks are passed as `None`: they keep positions aligned
+    with chunk ids but never match and don't count towards the corpus
+    statistics. Only live texts are decoded. Queries reopen the index with
+    `BM25Index.load_mmap` instead of re-indexing.
+    """
+    documents = [
+        store[chunk_id] if live else None
+        for chunk_id, live in enumerate(store.live_mask().tolist())
+    ]
+    BM25Index(documents).save(str(BM25_INDEX))
 
 
-def ingest(file_path: str) -> None:
+def ingest(file_path: str, client: QdrantClient | None = None) -> None:
     """Ingest a PDF document into the knowledge base.
 
+    `client` overrides the Qdrant client from `create_client()`.
+
     Pipeline:
-        Extract text (Rust/mmap)
-        → Token-aware chunking (Rust)
-        → Generate embeddings (Python/Ollama)
-        → Store vectors (Python/Qdrant)
-        → Cache chunks for BM25 (local file)
+        Extract text + token-aware chunking (Rust/mmap, one pass)
+        → Generate embeddings (Python/Ollama)     ┐ overlapped: batch N embeds
+        → Store vectors (Python/Qdrant)           ┘ while batch N-1 upserts
+        → Cache chunks + BM25 index (local files)
+    """
+    for _ in ingest_stream(file_path, client):
+        pass
+
+
+def ingest_stream(
+    file_path: str,
+    client: QdrantClient | None = None,
+    batch_size: int | None = None,
+) -> Iterator[int]:
+    """Ingest a PDF like `ingest`, yielding progress as batches are stored.
+
+    Chunks are embedded and stored `batch_size` at a time, by default
+    `embed_capacity()` so that every embedding worker gets a request.
+    Yields the running number of chunks stored after each batch. For a new
+    file, those chunks are already live: `retrieve` and `query` find them
+    by vector similarity. A re-ingested file keeps serving its previous
+    version until the last batch is stored. The BM25 index is rebuilt once
+    after the last batch, before the generator finishes.
+
+    Re-ingesting an unchanged file is a no-op that yields nothing. A changed
+    file is stored anew and replaces the old copy; its points are rewritten
+    in place and any left over from a longer old version are deleted.
     """
     max_tokens = int(os.getenv("CHUNK_MAX_TOKENS", "256"))
     overlap_tokens = int(os.getenv("CHUNK_OVERLAP_TOKENS", "32"))
 
-    console.print(f"  Extracting text from: [bold]{file_path}[/bold]")
-    text = extract_pdf_text(file_path)
-    console.print(f"  Extracted [green]{len(text):,}[/green] characters.")
+    _log(
+        f"  Extracting and chunking text from: [bold]{file_path}[/bold] "
+        f"(max_tokens={max_tokens}, overlap={overlap_tokens}) "
+        f"[dim]\\[Rust · mmap + token-aware][/dim]..."
+    )
+    chunks = extract_and_chunk(file_path, max_tokens, overlap_tokens)
+    _log(f"  Created [green]{len(chunks)}[/green] chunks.")
+
+    store = ChunkStore(CACHE_DIR)
+    source = str(Path(file_path).resolve())
+    if store.ids_of(source, chunks) is not None:
+        _log(
+            f"  [bold green]✓ '{file_path}' is unchanged; its {len(chunks)} chunks "
+            f"are already ingested.[/bold green]"
+        )
+        return
+
+    _log("  Connecting to Qdrant...")
+    if client is None:
+        client = create_client()
+    init_collection(client)
+    _drop_legacy_cache(client)
 
-    console.print(
-        f"  Chunking text (max_tokens={max_tokens}, overlap={overlap_tokens}) "
-        f"[dim]\\[Rust · token-aware][/dim]..."
+    _log(
+        "  Embedding and upserting chunks [dim]\\[Ollama → Qdrant, pipelined][/dim]..."
+    )
+    batch_size = batch_size or embed_capacity()
+    batches = (
+        chunks[i : i + batch_size] for i in range(0, len(chunks), batch_size)
+    )
+    previous = store.range_of(source)
+    first_id = len(store)
+    n_chunks = 0
+    for n_chunks in _embed_and_store(client, batches, store, source):
+        if previous is None:
+            # Nothing to hand off from: make each stored batch live at once
+            store.set_source(source, range(first_id, first_id + n_chunks))
+        yield n_chunks
+    store.set_source(source, range(first_id, first_id + n_chunks))
+
+    if previous is not None and len(previous) > n_chunks:
+        # The old version was longer: its trailing points were not overwritten
+        delete_chunks(client, source, range(n_chunks, len(previous)))
+
+    _log("  Building BM25 index...")
+    _save_bm25_index(store)
+
+    _log(
+        f"  [bold green]✓ Successfully ingested {n_chunks} chunks "
+        f"from '{file_path}'.[/bold green]"
     )
-    chunks = chunk_by_tokens(text, max_tokens, overlap_tokens)
-    console.print(f"  Created [green]{len(chunks)}[/green] chunks.")
 
-    console.print("  Generating embeddings [dim]\\[Ollama][/dim]...")
-    vectors = embed_texts(chunks)
-    console.print(f"  Generated [green]{len(vectors)}[/green] embeddings.")
 
-    console.print("  Connecting to Qdrant...")
-    client = create_client()
-    init_collection(client)
+def _embed_and_store(
+    client, batches: Iterable[list[str]], store: ChunkStore, source: str
+) -> Iterator[int]:
+    """Embed and store chunk batches, overlapping network-bound stages.
+
+    Each batch's embedding request is dispatched to a worker while the main
+    thread appends the previous batch to `store`, whose next ids become the
+    chunks' ids, and then upserts it to Qdrant. Points are keyed by `source`
+    and each chunk's index within it. Yields the running number of chunks
+    stored after each batch.
+    """
 
-    console.print("  Upserting chunks to Qdrant...")
-    upsert_chunks(client, chunks, vectors)
+    def flush(chunks: list[str], vectors: Future) -> int:
+        embedded = vectors.result()
+        # Store the texts before any point refers to their ids: an
+        # interrupted flush leaves at worst an orphan text, never a point
+        # whose chunk id is later reused by another document's chunk
+        first_id = len(store)
+        store.append(chunks)
+        upsert_chunks(
+            client,
+            chunks,
+            embedded,
+            first_id=first_id,
+            source=source,
+            first_index=n_chunks,
+        )
+        return len(chunks)
 
-    console.print("  Caching chunks for BM25 index...")
-    _save_chunk_cache(chunks)
+    n_chunks = 0
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        in_flight: tuple[list[str], Future] | None = None
+        for chunks in batches:
+            vectors = pool.submit(embed_texts, chunks)
+            if in_flight is not None:
+                n_chunks += flush(*in_flight)
+                yield n_chunks
+            in_flight = (chunks, vectors)
 
-    console.print(
-        f"  [bold green]✓ Successfully ingested {len(chunks)} chunks "
-        f"from '{file_path}'.[/bold green]"
-    )
+        if in_flight is not None:
+            n_chunks += flush(*in_flight)
+            yield n_chunks
 
 
-def query(question: str) -> str:
+def query(question: str, client: QdrantClient | None = None) -> str:
     """Query the knowledge base using hybrid search (vector + BM25).
 
+    `client` overrides the Qdrant client from `create_client()`.
+
     Pipeline:
         Embed query (Python/Ollama)
-        → Vector search (Python/Qdrant)
-        → BM25 keyword search (Rust)
+        → Vector search (Python/Qdrant) ∥ BM25 keyword search (Rust)
         → Reciprocal Rank Fusion (merge results)
         → Build context
         → LLM response (Python/Ollama)
     """
-    console.print(f'  Searching knowledge base for: "[italic]{question}[/italic]"')
-
-    # 1. Vector search via Qdrant
-    console.print("  Running vector search [dim]\\[Qdrant][/dim]...")
-    query_vector = embed_query(question)
-    client = create_client()
-    vector_results = search(client, query_vector, top_k=10, min_score=0.2)
-    console.print(f"    → {len(vector_results)} vector matches")
-
-    # 2. BM25 keyword search via Rust
-    cached_chunks = _load_chunk_cache()
-    bm25_results: list[tuple[str, float]] = []
-
-    if cached_chunks:
-        console.print("  Running BM25 keyword search [dim]\\[Rust][/dim]...")
-        index = BM25Index(cached_chunks)
-        bm25_hits = index.search(question, top_k=10)
-        bm25_results = [(cached_chunks[idx], score) for idx, score in bm25_hits]
-        console.print(f"    → {len(bm25_results)} keyword matches")
-
-    # 3. Merge results using Reciprocal Rank Fusion
-    merged = _reciprocal_rank_fusion(vector_results, bm25_results, top_k=3)
+    merged = retrieve(question, client)
 
     if not merged:
         return (
@@ -124,44 +249,106 @@ def query(question: str) -> str:
             "`rusty-rag ingest <file>`."
         )
 
-    scores_str = ", ".join(f"{score:.3f}" for _, score in merged)
-    console.print(
-        f"  Found [green]{len(merged)}[/green] relevant chunks "
-        f"(hybrid scores: {scores_str})"
-    )
+    if _log is not _quiet:
+        scores_str = ", ".join(f"{score:.3f}" for _, score in merged)
+        _log(
+            f"  Found [green]{len(merged)}[/green] relevant chunks "
+            f"(hybrid scores: {scores_str})"
+        )
 
-    # 4. Build context from retrieved chunks
-    context = "\n\n".join(
-        f"[Chunk {i + 1} | Score: {score:.3f}]\n{text}"
-        for i, (text, score) in enumerate(merged)
-    )
+    # 3. Build context from retrieved chunks
+    context = _build_context(merged)
 
-    # 5. Generate LLM response
-    console.print("  Generating response [dim]\\[Ollama][/dim]...")
+    # 4. Generate LLM response
+    _log("  Generating response [dim]\\[Ollama][/dim]...")
     return ask(question, context=context)
 
 
+def retrieve(
+    question: str, client: QdrantClient | None = None, top_k: int = 3
+) -> list[tuple[str, float]]:
+    """Return the `top_k` chunks most relevant to `question`, best first.
+
+    The retrieval half of `query` (hybrid search and rank fusion), without
+    the LLM call. Returns `(text, score)` pairs.
+    """
+    _log(f'  Searching knowledge base for: "[italic]{question}[/italic]"')
+
+    # 1. Vector search via Qdrant and BM25 keyword search via Rust, run side
+    # by side (BM25 scoring releases the GIL while Qdrant answers)
+    query_vector = embed_query(question)
+    if client is None:
+        client = create_client()
+    q_tokens = tokenize(question)
+    _drop_legacy_cache(client)
+    store = ChunkStore(CACHE_DIR)
+
+    _log("  Running vector search [dim]\\[Qdrant][/dim] + BM25 [dim]\\[Rust][/dim]...")
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        vector_future = pool.submit(search, client, query_vector, 10, 0.2)
+        bm25_future = pool.submit(_bm25_search, q_tokens, 10)
+        vector_hits = vector_future.result()
+        bm25_hits = bm25_future.result()
+
+    _log(f"    → {len(vector_hits)} vector matches, {len(bm25_hits)} keyword matches")
+
+    # 2. Merge results using Reciprocal Rank Fusion. Hits on tombstoned
+    # chunks (older copies of a re-ingested file) are dropped first
+    live = store.live_mask()
+    merged = _reciprocal_rank_fusion(
+        _live_ids(vector_hits, live), _live_ids(bm25_hits, live), top_k=top_k
+    )
+
+    # Only the final hits are decoded from the memory-mapped chunk store
+    return [(store[chunk_id], score) for chunk_id, score in merged]
+
+
+def _bm25_search(tokens: list[str], top_k: int) -> list[tuple[int, float]]:
+    """Search the precomputed BM25 index, or return no hits if none exists."""
+    if not BM25_INDEX.exists():
+        return []
+    return BM25Index.load_mmap(str(BM25_INDEX)).search_tokens(tokens, top_k=top_k)
+
+
+def _live_ids(hits: list[tuple[int, float]], live: np.ndarray) -> list[int]:
+    """Chunk ids of `hits`, in order, that are set in the store's live mask."""
+    return [chunk_id for chunk_id, _ in hits if chunk_id < live.size and live[chunk_id]]
+
+
+def _build_context(merged: list[tuple[str, float]]) -> str:
+    """Render retrieved `(text, score)` pairs as numbered context blocks."""
+    parts = [""] * len(merged)
+    for i, (text, score) in enumerate(merged):
+        parts[i] = _format_chunk(i + 1, score, text)
+    return "\n\n".join(parts)
+
+
 def _reciprocal_rank_fusion(
-    vector_results: list[tuple[str, float]],
-    bm25_results: list[tuple[str, float]],
+    vector_ids: list[int],
+    bm25_ids: list[int],
     top_k: int = 3,
     k: int = 60,
-) -> list[tuple[str, float]]:
-    """Merge two ranked result lists using Reciprocal Rank Fusion (RRF).
+) -> list[tuple[int, float]]:
+    """Merge two ranked lists of chunk ids using Reciprocal Rank Fusion (RRF).
 
     RRF is a simple, parameter-free method for combining ranked lists:
         RRF_score(d) = Σ 1 / (k + rank_i(d))
 
     where k=60 is the standard constant and rank_i is the position of
-    document d in result list i.
+    document d in result list i. The hit ids are compacted to one slot per
+    distinct id, so the merge costs O(n_results) whatever the chunk ids are,
+    and no chunk text is hashed or touched.
     """
-    scores: dict[str, float] = {}
+    ranked = [np.asarray(ids, dtype=np.intp) for ids in (vector_ids, bm25_ids)]
+    chunk_ids, slots = np.unique(np.concatenate(ranked), return_inverse=True)
+    ranks = np.concatenate([np.arange(1, ids.size + 1) for ids in ranked])
 
-    for rank, (text, _) in enumerate(vector_results):
-        scores[text] = scores.get(text, 0.0) + 1.0 / (k + rank + 1)
+    scores = np.zeros(chunk_ids.size, dtype=np.float32)
+    np.add.at(scores, slots, 1.0 / (k + ranks))
 
-    for rank, (text, _) in enumerate(bm25_results):
-        scores[text] = scores.get(text, 0.0) + 1.0 / (k + rank + 1)
+    hits = np.arange(chunk_ids.size)
+    if hits.size > top_k:
+        hits = np.argpartition(-scores, top_k)[:top_k]
+    hits = hits[np.argsort(-scores[hits], kind="stable")]
 
-    sorted_results = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-    return sorted_results[:top_k]
+    return [(int(chunk_ids[i]), float(scores[i])) for i in hits]
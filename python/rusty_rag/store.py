@@ -0,0 +1,125 @@
+"""Local chunk text store, addressable by chunk id."""
+
+import json
+import mmap
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+import numpy as np
+
+
+class ChunkStore:
+    """Append-only store of chunk texts backed by two flat files.
+
+    `texts.bin` holds the UTF-8 bytes of every chunk back to back, and
+    `offsets.u64` holds the end offset of each chunk as little-endian u64.
+    Both are memory-mapped, so `store[i]` decodes only the requested chunk
+    and nothing is parsed up front.
+
+    `sources.json` maps each ingested source to the id range its chunks
+    occupy. Only ids inside a recorded range are live: re-ingesting a
+    changed source moves it to a new range and tombstones the old one, and
+    chunks from an ingest interrupted before recording them stay unreferenced.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.texts_path = directory / "texts.bin"
+        self.offsets_path = directory / "offsets.u64"
+        self.sources_path = directory / "sources.json"
+        self._load()
+        try:
+            sources = json.loads(self.sources_path.read_bytes())
+        except FileNotFoundError:
+            sources = {}
+        self._sources = {source: range(*ids) for source, ids in sources.items()}
+
+    def _load(self) -> None:
+        # Offsets first: appends write texts before offsets, so every offset
+        # seen here already has its bytes in texts.bin, even mid-append.
+        # A partially written trailing entry is ignored.
+        offsets = _map(self.offsets_path)
+        self._offsets = np.frombuffer(offsets, dtype="<u8", count=len(offsets) // 8)
+        self._texts = memoryview(_map(self.texts_path))
+        self._live = None
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def __getitem__(self, i: int) -> str:
+        if not 0 <= i < len(self._offsets):
+            raise IndexError(f"chunk id {i} out of range")
+        start = int(self._offsets[i - 1]) if i else 0
+        return str(self._texts[start : int(self._offsets[i])], "utf-8")
+
+    def __iter__(self) -> Iterator[str]:
+        return (self[i] for i in range(len(self)))
+
+    def live_mask(self) -> np.ndarray:
+        """Boolean mask over all chunk ids: True where the chunk belongs to
+        the current version of some source.
+
+        Built once per store state with one slice assignment per source.
+        Treat the returned array as read-only.
+        """
+        if self._live is None:
+            live = np.zeros(len(self), dtype=bool)
+            for ids in self._sources.values():
+                live[ids.start : ids.stop] = True
+            self._live = live
+        return self._live
+
+    def range_of(self, source: str) -> range | None:
+        """Return the ids currently recorded for `source`, if any."""
+        return self._sources.get(source)
+
+    def ids_of(self, source: str, chunks: list[str]) -> range | None:
+        """Return the ids `source` is stored under, if its chunks are unchanged."""
+        ids = self._sources.get(source)
+        if ids is None or len(ids) != len(chunks) or ids.stop > len(self):
+            return None
+        if any(self[i] != chunk for i, chunk in zip(ids, chunks)):
+            return None
+        return ids
+
+    def set_source(self, source: str, ids: range) -> None:
+        """Record `ids` as the chunks of `source`, tombstoning its previous ones."""
+        self._sources[source] = ids
+        self._live = None
+        tmp_path = self.sources_path.with_suffix(".tmp")
+        tmp_path.write_text(
+            json.dumps({s: [r.start, r.stop] for s, r in self._sources.items()})
+        )
+        os.replace(tmp_path, self.sources_path)
+
+    def append(self, chunks: list[str]) -> None:
+        """Append chunks; they get the next ids in order."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        data = [chunk.encode("utf-8") for chunk in chunks]
+
+        end = int(self._offsets[-1]) if len(self._offsets) else 0
+        ends = end + np.cumsum([len(d) for d in data], dtype="<u8")
+
+        # Texts first: offsets never point past the end of texts.bin
+        with open(self.texts_path, "ab") as f:
+            if f.tell() != end:
+                # Drop bytes left by an append that never recorded its offsets
+                f.truncate(end)
+            f.writelines(data)
+        with open(self.offsets_path, "ab") as f:
+            if f.tell() != 8 * len(self._offsets):
+                f.truncate(8 * len(self._offsets))
+            f.write(ends.astype("<u8").tobytes())
+
+        self._load()
+
+
+def _map(path: Path) -> mmap.mmap | bytes:
+    """Map `path` read-only, or return empty bytes if it's missing or empty."""
+    try:
+        with open(path, "rb") as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        # mmap refuses zero-length files
+        return b""
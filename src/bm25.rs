@@ -3,126 +3,425 @@
 /// Implements the standard BM25 ranking function:
 ///   score(D, Q) = Σ IDF(qi) × (f(qi,D) × (k1+1)) / (f(qi,D) + k1 × (1 - b + b × |D|/avgdl))
 ///
+/// Every (term, document) contribution is precomputed at index time into a
+/// CSC-style sparse matrix (one column of postings per term), so a query only
+/// touches the postings of its own terms. The index lives in a single flat
+/// little-endian buffer that can be written to disk and memory-mapped back
+/// without any parsing:
+///
+///   header       magic, n_docs, n_terms, nnz (u64), k1, b, avg_dl (f64)
+///   doc_lengths  u32 × n_docs
+///   term_offsets u64 × (n_terms + 1)   byte offsets into `terms`
+///   col_ptr      u64 × (n_terms + 1)   posting offsets per term
+///   doc_ids      u32 × nnz
+///   scores       f32 × nnz
+///   terms        UTF-8 bytes of the sorted vocabulary
+///
 /// Built entirely in Rust for performance when scoring thousands of chunks.
 
+use anyhow::{Context, Result};
+use memmap2::Mmap;
 use pyo3::prelude::*;
-use std::collections::{HashMap, HashSet};
+use std::cmp::Ordering;
+use std::collections::HashMap;
+use std::fs::{self, File};
+use std::ops::Deref;
 
 use crate::tokenizer;
 
+const MAGIC: &[u8; 8] = b"RRBM25v1";
+const HEADER_LEN: usize = 8 + 3 * 8 + 3 * 8;
+
+/// Backing storage for the flat index: built in memory or mapped from disk.
+enum Buffer {
+    Owned(Vec<u8>),
+    Mapped(Mmap),
+}
+
+impl Deref for Buffer {
+    type Target = [u8];
+
+    fn deref(&self) -> &[u8] {
+        match self {
+            Buffer::Owned(bytes) => bytes,
+            Buffer::Mapped(mmap) => mmap,
+        }
+    }
+}
+
+fn read_u32(bytes: &[u8], pos: usize) -> u32 {
+    u32::from_le_bytes(bytes[pos..pos + 4].try_into().unwrap())
+}
+
+fn read_u64(bytes: &[u8], pos: usize) -> u64 {
+    u64::from_le_bytes(bytes[pos..pos + 8].try_into().unwrap())
+}
+
+fn read_f32(bytes: &[u8], pos: usize) -> f32 {
+    f32::from_le_bytes(bytes[pos..pos + 4].try_into().unwrap())
+}
+
+fn read_f64(bytes: &[u8], pos: usize) -> f64 {
+    f64::from_le_bytes(bytes[pos..pos + 8].try_into().unwrap())
+}
+
 /// A BM25 search index built from a collection of text documents.
 ///
 /// Construct from Python with:
 ///     index = BM25Index(["chunk 1 text", "chunk 2 text", ...])
 ///     results = index.search("my query", top_k=5)
+///
+/// Persist and reopen without re-indexing:
+///     index.save("bm25.idx")
+///     index = BM25Index.load_mmap("bm25.idx")
 #[pyclass]
 pub struct BM25Index {
-    /// Term → number of documents containing it
-    df: HashMap<String, usize>,
-    /// Per-document term frequencies
-    tf: Vec<HashMap<String, usize>>,
-    /// Token count per document
-    doc_lengths: Vec<usize>,
+    /// Flat serialized index (see module docs for the layout)
+    buf: Buffer,
     /// Average document length
     avg_dl: f64,
     /// Total number of documents
     n_docs: usize,
+    /// Number of distinct terms
+    n_terms: usize,
     /// BM25 tuning parameters
     k1: f64,
     b: f64,
+    /// Byte offsets of each section within `buf`
+    term_offsets_at: usize,
+    col_ptr_at: usize,
+    doc_ids_at: usize,
+    scores_at: usize,
+    terms_at: usize,
 }
 
-#[pymethods]
 impl BM25Index {
-    /// Build a BM25 index from a list of document strings.
+    /// Tokenize and score `documents`, serializing the result into a flat buffer.
     ///
-    /// Args:
-    ///     documents: List of text strings to index.
-    ///     k1: Term frequency saturation parameter (default 1.2).
-    ///     b: Length normalization parameter (default 0.75).
-    #[new]
-    #[pyo3(signature = (documents, k1=1.2, b=0.75))]
-    fn new(documents: Vec<String>, k1: f64, b: f64) -> Self {
+    /// `None` entries keep their position but are left out of N and the
+    /// average length, so they don't skew the scores of the other documents.
+    fn build(documents: &[Option<String>], k1: f64, b: f64) -> Vec<u8> {
         let n_docs = documents.len();
-        let mut df: HashMap<String, usize> = HashMap::new();
-        let mut tf: Vec<HashMap<String, usize>> = Vec::with_capacity(n_docs);
+        let n_live = documents.iter().filter(|doc| doc.is_some()).count();
+        let mut postings: HashMap<String, Vec<(u32, usize)>> = HashMap::new();
         let mut doc_lengths: Vec<usize> = Vec::with_capacity(n_docs);
 
-        for doc in &documents {
-            let tokens = tokenizer::tokenize(doc);
+        for (doc_idx, doc) in documents.iter().enumerate() {
+            let tokens = doc.as_deref().map(tokenizer::tokenize).unwrap_or_default();
             doc_lengths.push(tokens.len());
 
             let mut term_freq: HashMap<String, usize> = HashMap::new();
-            let mut seen: HashSet<String> = HashSet::new();
-
-            for token in &tokens {
-                *term_freq.entry(token.clone()).or_insert(0) += 1;
-                if seen.insert(token.clone()) {
-                    *df.entry(token.clone()).or_insert(0) += 1;
-                }
+            for token in tokens {
+                *term_freq.entry(token).or_insert(0) += 1;
             }
 
-            tf.push(term_freq);
+            for (term, tf) in term_freq {
+                postings.entry(term).or_default().push((doc_idx as u32, tf));
+            }
         }
 
-        let avg_dl = if n_docs > 0 {
-            doc_lengths.iter().sum::<usize>() as f64 / n_docs as f64
+        let avg_dl = if n_live > 0 {
+            doc_lengths.iter().sum::<usize>() as f64 / n_live as f64
         } else {
             0.0
         };
 
-        BM25Index {
-            df,
-            tf,
-            doc_lengths,
+        let mut terms: Vec<(String, Vec<(u32, usize)>)> = postings.into_iter().collect();
+        terms.sort_unstable_by(|a, b| a.0.cmp(&b.0));
+
+        let n_terms = terms.len();
+        let nnz: usize = terms.iter().map(|(_, docs)| docs.len()).sum();
+        let terms_len: usize = terms.iter().map(|(term, _)| term.len()).sum();
+
+        let mut buf = Vec::with_capacity(
+            HEADER_LEN + 4 * n_docs + 16 * (n_terms + 1) + 8 * nnz + terms_len,
+        );
+        buf.extend_from_slice(MAGIC);
+        buf.extend_from_slice(&(n_docs as u64).to_le_bytes());
+        buf.extend_from_slice(&(n_terms as u64).to_le_bytes());
+        buf.extend_from_slice(&(nnz as u64).to_le_bytes());
+        buf.extend_from_slice(&k1.to_le_bytes());
+        buf.extend_from_slice(&b.to_le_bytes());
+        buf.extend_from_slice(&avg_dl.to_le_bytes());
+
+        for &len in &doc_lengths {
+            buf.extend_from_slice(&(len as u32).to_le_bytes());
+        }
+
+        let mut offset = 0u64;
+        buf.extend_from_slice(&offset.to_le_bytes());
+        for (term, _) in &terms {
+            offset += term.len() as u64;
+            buf.extend_from_slice(&offset.to_le_bytes());
+        }
+
+        let mut ptr = 0u64;
+        buf.extend_from_slice(&ptr.to_le_bytes());
+        for (_, docs) in &terms {
+            ptr += docs.len() as u64;
+            buf.extend_from_slice(&ptr.to_le_bytes());
+        }
+
+        for (_, docs) in &terms {
+            for &(doc_idx, _) in docs {
+                buf.extend_from_slice(&doc_idx.to_le_bytes());
+            }
+        }
+
+        for (_, docs) in &terms {
+            let df = docs.len() as f64;
+            // IDF: log((N - df + 0.5) / (df + 0.5) + 1)
+            let idf = ((n_live as f64 - df + 0.5) / (df + 0.5) + 1.0).ln();
+
+            for &(doc_idx, tf) in docs {
+                let tf = tf as f64;
+                let doc_len = doc_lengths[doc_idx as usize] as f64;
+
+                // TF with length normalization
+                let tf_norm =
+                    (tf * (k1 + 1.0)) / (tf + k1 * (1.0 - b + b * doc_len / avg_dl));
+
+                buf.extend_from_slice(&((idf * tf_norm) as f32).to_le_bytes());
+            }
+        }
+
+        for (term, _) in &terms {
+            buf.extend_from_slice(term.as_bytes());
+        }
+
+        buf
+    }
+
+    /// Wrap a serialized index, validating its header, section sizes and
+    /// offsets so that searching it can never index out of bounds.
+    fn from_buffer(buf: Buffer) -> Result<Self> {
+        if buf.len() < HEADER_LEN || &buf[..8] != MAGIC {
+            anyhow::bail!("Not a BM25 index file (bad header)");
+        }
+
+        let n_docs = read_u64(&buf, 8) as usize;
+        let n_terms = read_u64(&buf, 16) as usize;
+        let nnz = read_u64(&buf, 24) as usize;
+        let k1 = read_f64(&buf, 32);
+        let b = read_f64(&buf, 40);
+        let avg_dl = read_f64(&buf, 48);
+
+        // The counts come from the file, so section offsets use checked
+        // arithmetic. Document lengths are only needed to build the scores,
+        // so that section is skipped rather than decoded on every load.
+        let layout = || -> Option<[usize; 5]> {
+            let table_len = n_terms.checked_add(1)?.checked_mul(8)?;
+            let term_offsets_at = HEADER_LEN.checked_add(n_docs.checked_mul(4)?)?;
+            let col_ptr_at = term_offsets_at.checked_add(table_len)?;
+            let doc_ids_at = col_ptr_at.checked_add(table_len)?;
+            let scores_at = doc_ids_at.checked_add(nnz.checked_mul(4)?)?;
+            let terms_at = scores_at.checked_add(nnz.checked_mul(4)?)?;
+            Some([term_offsets_at, col_ptr_at, doc_ids_at, scores_at, terms_at])
+        };
+        let [term_offsets_at, col_ptr_at, doc_ids_at, scores_at, terms_at] = match layout() {
+            Some(offsets) if offsets[4] <= buf.len() => offsets,
+            _ => anyhow::bail!("BM25 index file is truncated"),
+        };
+        let terms_len = read_u64(&buf, term_offsets_at + 8 * n_terms) as usize;
+        if buf.len() - terms_at != terms_len {
+            anyhow::bail!("BM25 index file is truncated");
+        }
+
+        // Both offset tables must start at 0, never decrease and end at the
+        // size of the section they index; every posting must name a document
+        let monotone = |at: usize, end: usize| {
+            let entry = |i: usize| read_u64(&buf, at + 8 * i);
+            entry(0) == 0
+                && (0..n_terms).all(|i| entry(i) <= entry(i + 1))
+                && entry(n_terms) == end as u64
+        };
+        if !monotone(term_offsets_at, terms_len) || !monotone(col_ptr_at, nnz) {
+            anyhow::bail!("BM25 index file is corrupt (bad offsets)");
+        }
+        if (0..nnz).any(|p| read_u32(&buf, doc_ids_at + 4 * p) as usize >= n_docs) {
+            anyhow::bail!("BM25 index file is corrupt (document id out of range)");
+        }
+
+        Ok(BM25Index {
+            buf,
             avg_dl,
             n_docs,
+            n_terms,
             k1,
             b,
-        }
+            term_offsets_at,
+            col_ptr_at,
+            doc_ids_at,
+            scores_at,
+            terms_at,
+        })
     }
 
-    /// Score all documents against the query and return top-k results.
-    ///
-    /// Returns a list of (document_index, score) tuples, sorted by
-    /// score descending. Only documents with score > 0 are returned.
-    #[pyo3(signature = (query, top_k=10))]
-    fn search(&self, query: &str, top_k: usize) -> Vec<(usize, f64)> {
-        let query_tokens = tokenizer::tokenize(query);
-        let mut scores: Vec<(usize, f64)> = Vec::new();
+    /// Decode the token count of every document from the buffer.
+    #[cfg(test)]
+    fn doc_lengths(&self) -> Vec<usize> {
+        (0..self.n_docs)
+            .map(|i| read_u32(&self.buf, HEADER_LEN + 4 * i) as usize)
+            .collect()
+    }
 
-        for (doc_idx, doc_tf) in self.tf.iter().enumerate() {
-            let doc_len = self.doc_lengths[doc_idx] as f64;
-            let mut score = 0.0;
+    /// Return the vocabulary entry at column `idx`.
+    fn term(&self, idx: usize) -> &[u8] {
+        let start = read_u64(&self.buf, self.term_offsets_at + 8 * idx) as usize;
+        let end = read_u64(&self.buf, self.term_offsets_at + 8 * (idx + 1)) as usize;
+        &self.buf[self.terms_at + start..self.terms_at + end]
+    }
 
-            for token in &query_tokens {
-                let tf = *doc_tf.get(token).unwrap_or(&0) as f64;
-                let df = *self.df.get(token).unwrap_or(&0) as f64;
+    /// Binary-search the sorted vocabulary for `token`'s column.
+    fn find_term(&self, token: &str) -> Option<usize> {
+        let needle = token.as_bytes();
+        let (mut lo, mut hi) = (0, self.n_terms);
 
-                if tf == 0.0 {
-                    continue;
-                }
+        while lo < hi {
+            let mid = lo + (hi - lo) / 2;
+            match self.term(mid).cmp(needle) {
+                Ordering::Less => lo = mid + 1,
+                Ordering::Greater => hi = mid,
+                Ordering::Equal => return Some(mid),
+            }
+        }
+        None
+    }
 
-                // IDF: log((N - df + 0.5) / (df + 0.5) + 1)
-                let idf = ((self.n_docs as f64 - df + 0.5) / (df + 0.5) + 1.0).ln();
+    /// Tokenize `query` and rank the documents against it.
+    fn search_text(&self, query: &str, top_k: usize) -> Vec<(usize, f64)> {
+        self.rank(&tokenizer::tokenize(query), top_k)
+    }
 
-                // TF with length normalization
-                let tf_norm = (tf * (self.k1 + 1.0))
-                    / (tf + self.k1 * (1.0 - self.b + self.b * doc_len / self.avg_dl));
+    /// Score the documents containing any of `query_tokens` and return the top-k.
+    fn rank(&self, query_tokens: &[String], top_k: usize) -> Vec<(usize, f64)> {
+        let mut acc: Vec<f64> = vec![0.0; self.n_docs];
+        let mut touched: Vec<usize> = Vec::new();
 
-                score += idf * tf_norm;
-            }
+        for token in query_tokens {
+            let Some(col) = self.find_term(token) else {
+                continue;
+            };
+
+            let start = read_u64(&self.buf, self.col_ptr_at + 8 * col) as usize;
+            let end = read_u64(&self.buf, self.col_ptr_at + 8 * (col + 1)) as usize;
 
-            if score > 0.0 {
-                scores.push((doc_idx, score));
+            for p in start..end {
+                let doc_idx = read_u32(&self.buf, self.doc_ids_at + 4 * p) as usize;
+                if acc[doc_idx] == 0.0 {
+                    touched.push(doc_idx);
+                }
+                acc[doc_idx] += read_f32(&self.buf, self.scores_at + 4 * p) as f64;
             }
         }
 
-        scores.sort_by(|a, b| b.1.partial_cmp(&a.1).unwrap_or(std::cmp::Ordering::Equal));
-        scores.truncate(top_k);
+        let mut scores: Vec<(usize, f64)> = touched
+            .into_iter()
+            .map(|doc_idx| (doc_idx, acc[doc_idx]))
+            .filter(|&(_, score)| score > 0.0)
+            .collect();
+
+        // Score descending, ties broken by document order
+        let rank = |a: &(usize, f64), b: &(usize, f64)| {
+            b.1.partial_cmp(&a.1)
+                .unwrap_or(Ordering::Equal)
+                .then(a.0.cmp(&b.0))
+        };
+
+        if top_k == 0 {
+            return vec![];
+        }
+
+        // Partial selection (argpartition) first, so only top_k hits are sorted
+        if scores.len() > top_k {
+            scores.select_nth_unstable_by(top_k - 1, rank);
+            scores.truncate(top_k);
+        }
+        scores.sort_unstable_by(rank);
         scores
     }
 
+    /// Write the serialized index to `path`, replacing any existing file atomically.
+    fn save_to(&self, path: &str) -> Result<()> {
+        let tmp_path = format!("{}.tmp", path);
+        fs::write(&tmp_path, &self.buf[..])
+            .with_context(|| format!("Failed to write BM25 index: {}", tmp_path))?;
+        fs::rename(&tmp_path, path)
+            .with_context(|| format!("Failed to write BM25 index: {}", path))?;
+        Ok(())
+    }
+
+    /// Memory-map a previously saved index from `path`.
+    fn open(path: &str) -> Result<Self> {
+        let file = File::open(path)
+            .with_context(|| format!("Failed to open BM25 index: {}", path))?;
+        // SAFETY: The file is opened read-only and `save` replaces it via
+        // rename, so an existing mapping never observes a partial write.
+        let mmap = unsafe { Mmap::map(&file) }
+            .with_context(|| format!("Failed to memory-map BM25 index: {}", path))?;
+
+        Self::from_buffer(Buffer::Mapped(mmap))
+            .with_context(|| format!("Failed to load BM25 index: {}", path))
+    }
+}
+
+#[pymethods]
+impl BM25Index {
+    /// Build a BM25 index from a list of document strings.
+    ///
+    /// Args:
+    ///     documents: List of text strings to index. A `None` entry holds its
+    ///         position (so later indices don't shift) but never matches and
+    ///         is left out of the corpus statistics.
+    ///     k1: Term frequency saturation parameter (default 1.2).
+    ///     b: Length normalization parameter (default 0.75).
+    #[new]
+    #[pyo3(signature = (documents, k1=1.2, b=0.75))]
+    fn new(documents: Vec<Option<String>>, k1: f64, b: f64) -> Self {
+        let buf = Self::build(&documents, k1, b);
+        Self::from_buffer(Buffer::Owned(buf)).expect("freshly built index is well-formed")
+    }
+
+    /// Save the index to `path` so it can be reopened with `load_mmap`.
+    fn save(&self, path: &str) -> PyResult<()> {
+        self.save_to(path)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{:#}", e)))
+    }
+
+    /// Open a saved index read-only via mmap, without re-tokenizing the corpus.
+    ///
+    /// Pages are loaded lazily by the OS and shared with its page cache.
+    #[staticmethod]
+    fn load_mmap(path: &str) -> PyResult<Self> {
+        Self::open(path)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{:#}", e)))
+    }
+
+    /// Score all documents against the query and return top-k results.
+    ///
+    /// Returns a list of (document_index, score) tuples, sorted by
+    /// score descending. Only documents with score > 0 are returned.
+    /// The GIL is released while scoring, so other Python threads keep
+    /// running.
+    #[pyo3(signature = (query, top_k=10))]
+    fn search(&self, py: Python<'_>, query: &str, top_k: usize) -> Vec<(usize, f64)> {
+        py.allow_threads(|| self.search_text(query, top_k))
+    }
+
+    /// Like `search`, but with a query that is already tokenized.
+    ///
+    /// `tokens` must come from `tokenize()` (lowercased word tokens), so a
+    /// caller that needs the tokens anyway only tokenizes the query once.
+    #[pyo3(signature = (tokens, top_k=10))]
+    fn search_tokens(
+        &self,
+        py: Python<'_>,
+        tokens: Vec<String>,
+        top_k: usize,
+    ) -> Vec<(usize, f64)> {
+        py.allow_threads(|| self.rank(&tokens, top_k))
+    }
+
     /// Return the number of indexed documents.
     fn __len__(&self) -> usize {
         self.n_docs
@@ -133,7 +432,7 @@ impl BM25Index {
         format!(
             "BM25Index(n_docs={}, vocab_size={}, avg_dl={:.1}, k1={}, b={})",
             self.n_docs,
-            self.df.len(),
+            self.n_terms,
             self.avg_dl,
             self.k1,
             self.b
@@ -145,6 +444,11 @@ impl BM25Index {
 mod tests {
     use super::*;
 
+    /// Wrap plain documents as present entries for `BM25Index::new`.
+    fn docs_of(docs: Vec<String>) -> Vec<Option<String>> {
+        docs.into_iter().map(Some).collect()
+    }
+
     #[test]
     fn test_build_index() {
         let docs = vec![
@@ -152,9 +456,9 @@ mod tests {
             "the dog sat on the log".to_string(),
             "the cat chased the dog".to_string(),
         ];
-        let index = BM25Index::new(docs, 1.2, 0.75);
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
         assert_eq!(index.n_docs, 3);
-        assert_eq!(index.doc_lengths, vec![6, 6, 5]);
+        assert_eq!(index.doc_lengths(), vec![6, 6, 5]);
     }
 
     #[test]
@@ -164,8 +468,8 @@ mod tests {
             "cooking recipes and food preparation".to_string(),
             "neural networks for machine learning".to_string(),
         ];
-        let index = BM25Index::new(docs, 1.2, 0.75);
-        let results = index.search("machine learning", 3);
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+        let results = index.search_text("machine learning", 3);
 
         // Docs 0 and 2 should rank higher than doc 1
         assert!(!results.is_empty());
@@ -180,15 +484,15 @@ mod tests {
             "the cat sat on the mat".to_string(),
             "the dog sat on the log".to_string(),
         ];
-        let index = BM25Index::new(docs, 1.2, 0.75);
-        let results = index.search("quantum physics", 5);
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+        let results = index.search_text("quantum physics", 5);
         assert!(results.is_empty());
     }
 
     #[test]
     fn test_empty_index() {
         let index = BM25Index::new(vec![], 1.2, 0.75);
-        let results = index.search("anything", 5);
+        let results = index.search_text("anything", 5);
         assert!(results.is_empty());
         assert_eq!(index.n_docs, 0);
     }
@@ -198,8 +502,8 @@ mod tests {
         let docs: Vec<String> = (0..20)
             .map(|i| format!("document number {} about rust programming", i))
             .collect();
-        let index = BM25Index::new(docs, 1.2, 0.75);
-        let results = index.search("rust programming", 5);
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+        let results = index.search_text("rust programming", 5);
         assert!(results.len() <= 5);
     }
 
@@ -210,8 +514,8 @@ mod tests {
             "python scripting language interpreted".to_string(),    // has: none of query terms
             "rust is great for systems programming".to_string(),   // has: rust, programming, systems
         ];
-        let index = BM25Index::new(docs, 1.2, 0.75);
-        let results = index.search("rust systems programming", 3);
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+        let results = index.search_text("rust systems programming", 3);
 
         // Docs 0 and 2 have all query terms, doc 1 has none
         assert!(results.len() >= 2);
@@ -219,4 +523,111 @@ mod tests {
         assert!(top_indices.contains(&0));
         assert!(top_indices.contains(&2));
     }
+
+    #[test]
+    fn test_top_k_matches_full_ranking() {
+        let docs: Vec<String> = (0..50)
+            .map(|i| format!("{} rust {}", "systems ".repeat(i % 7), "filler ".repeat(i % 5)))
+            .collect();
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+
+        let all = index.search_text("rust systems", 50);
+        let top = index.search_text("rust systems", 5);
+        assert_eq!(top, all[..5].to_vec());
+        assert!(index.search_text("rust systems", 0).is_empty());
+    }
+
+    #[test]
+    fn test_search_tokens_matches_search() {
+        let docs = vec![
+            "machine learning and deep learning".to_string(),
+            "cooking recipes and food preparation".to_string(),
+            "neural networks for machine learning".to_string(),
+        ];
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+        let tokens = tokenizer::tokenize("Machine LEARNING");
+        assert_eq!(
+            index.rank(&tokens, 3),
+            index.search_text("Machine LEARNING", 3)
+        );
+    }
+
+    #[test]
+    fn test_save_and_load_mmap() {
+        let docs = vec![
+            "machine learning and deep learning".to_string(),
+            "cooking recipes and food preparation".to_string(),
+            "neural networks for machine learning".to_string(),
+        ];
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+        let path = std::env::temp_dir().join(format!("rusty_rag_bm25_{}.idx", std::process::id()));
+        let path = path.to_str().unwrap();
+
+        index.save_to(path).unwrap();
+        let loaded = BM25Index::open(path).unwrap();
+        std::fs::remove_file(path).unwrap();
+
+        assert_eq!(loaded.n_docs, index.n_docs);
+        assert_eq!(loaded.doc_lengths(), index.doc_lengths());
+        assert_eq!(
+            loaded.search_text("machine learning", 3),
+            index.search_text("machine learning", 3)
+        );
+    }
+
+    #[test]
+    fn test_absent_documents_keep_positions_and_stats() {
+        let docs = vec![
+            "machine learning and deep learning".to_string(),
+            "cooking recipes and food preparation".to_string(),
+            "neural networks for machine learning".to_string(),
+        ];
+        let present = vec![Some(docs[0].clone()), Some(docs[2].clone())];
+        let with_gap = vec![Some(docs[0].clone()), None, Some(docs[2].clone())];
+        let live = BM25Index::new(present, 1.2, 0.75);
+        let index = BM25Index::new(with_gap, 1.2, 0.75);
+
+        assert_eq!(index.n_docs, 3);
+        assert_eq!(index.avg_dl, live.avg_dl);
+        assert!(index.search_text("cooking", 3).is_empty());
+
+        // Same scores as an index without the absent document; ids keep gaps
+        let remap = |hits: Vec<(usize, f64)>| -> Vec<(usize, f64)> {
+            hits.into_iter().map(|(i, s)| (if i == 1 { 2 } else { i }, s)).collect()
+        };
+        assert_eq!(
+            index.search_text("machine learning", 3),
+            remap(live.search_text("machine learning", 3))
+        );
+    }
+
+    #[test]
+    fn test_load_rejects_garbage() {
+        let garbage = Buffer::Owned(b"not an index".to_vec());
+        assert!(BM25Index::from_buffer(garbage).is_err());
+    }
+
+    /// Serialize a small index and overwrite the little-endian bytes at `pos`.
+    fn corrupted(pos: impl Fn(&BM25Index) -> usize, bytes: &[u8]) -> Result<BM25Index> {
+        let docs = vec![
+            "machine learning and deep learning".to_string(),
+            "cooking recipes and food preparation".to_string(),
+        ];
+        let index = BM25Index::new(docs_of(docs), 1.2, 0.75);
+        let at = pos(&index);
+        let mut buf = index.buf.to_vec();
+        buf[at..at + bytes.len()].copy_from_slice(bytes);
+        BM25Index::from_buffer(Buffer::Owned(buf))
+    }
+
+    #[test]
+    fn test_load_rejects_corrupt_sections() {
+        // Same file size, but each one would make a search index out of bounds
+        assert!(corrupted(|_| 8, &u64::MAX.to_le_bytes()).is_err()); // n_docs
+        assert!(corrupted(|_| 16, &(u64::MAX / 8).to_le_bytes()).is_err()); // n_terms
+        assert!(corrupted(|i| i.doc_ids_at, &99u32.to_le_bytes()).is_err());
+        assert!(corrupted(|i| i.col_ptr_at + 8, &1000u64.to_le_bytes()).is_err());
+        assert!(corrupted(|i| i.term_offsets_at + 8, &1000u64.to_le_bytes()).is_err());
+        assert!(corrupted(|i| i.doc_ids_at, &0u32.to_le_bytes()).is_ok());
+    }
 }
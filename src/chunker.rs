@@ -91,25 +91,68 @@ pub fn chunk_text_parallel(text: &str, chunk_size: usize, overlap: usize) -> Vec
         .collect()
 }
 
-/// Token-aware text chunking with overlap.
-///
-/// Splits text into chunks where each chunk contains at most `max_tokens` words.
-/// Maintains `overlap_tokens` words of overlap between adjacent chunks.
-/// Preserves original text formatting (whitespace, punctuation) within each chunk.
+const ONES: u64 = 0x0101_0101_0101_0101;
+const HIGH_BITS: u64 = 0x8080_8080_8080_8080;
+
+/// High bit of each byte set where that byte lies in `lo..=hi`.
 ///
-/// This produces chunks that align with how LLMs tokenize text, preventing
-/// mid-word splits and wasted context window space.
-pub fn chunk_by_tokens(text: &str, max_tokens: usize, overlap_tokens: usize) -> Vec<String> {
-    if text.is_empty() || max_tokens == 0 {
-        return vec![];
-    }
+/// Only valid when every byte of `v` is ASCII (< 0x80): the per-byte sums
+/// then never carry into the neighbouring byte.
+#[inline]
+fn bytes_in_range(v: u64, lo: u8, hi: u8) -> u64 {
+    let ge_lo = v + ONES * (0x80 - lo as u64);
+    let gt_hi = v + ONES * (0x7F - hi as u64);
+    ge_lo & !gt_hi & HIGH_BITS
+}
+
+/// Classify 8 ASCII bytes at once: bit k is set if byte k is a word
+/// character (`[0-9A-Za-z']`, the ASCII subset of the tokenizer's rule).
+#[inline]
+fn ascii_word_mask(v: u64) -> u8 {
+    let word = bytes_in_range(v | ONES * 0x20, b'a', b'z')
+        | bytes_in_range(v, b'0', b'9')
+        | bytes_in_range(v, b'\'', b'\'');
+    // Gather the 8 high bits into one byte
+    ((word >> 7).wrapping_mul(0x0102_0408_1020_4080) >> 56) as u8
+}
 
-    // Find word boundaries (byte start, byte end) using same logic as tokenizer
+/// Find word boundaries (byte start, byte end) using the same logic as the tokenizer.
+///
+/// Pure-ASCII stretches are classified 8 bytes at a time (SWAR) and word
+/// starts/ends are read off the resulting bitmask; any 8-byte window holding
+/// a non-ASCII byte falls back to decoding one `char` at a time.
+fn word_spans(text: &str) -> Vec<(usize, usize)> {
+    let bytes = text.as_bytes();
     let mut word_spans: Vec<(usize, usize)> = Vec::new();
     let mut in_word = false;
     let mut word_start = 0;
+    let mut i = 0;
+
+    while i < bytes.len() {
+        if let Some(block) = bytes.get(i..i + 8) {
+            let v = u64::from_le_bytes(block.try_into().unwrap());
+            if v & HIGH_BITS == 0 {
+                let mask = ascii_word_mask(v) as u32;
+                // Bit k of `prev` tells whether the byte before byte k is a word char
+                let prev = (mask << 1) | in_word as u32;
+                let mut edges = (mask ^ prev) & 0xFF;
+                while edges != 0 {
+                    let k = edges.trailing_zeros() as usize;
+                    if mask & (1 << k) != 0 {
+                        word_start = i + k;
+                    } else {
+                        word_spans.push((word_start, i + k));
+                    }
+                    edges &= edges - 1;
+                }
+                in_word = mask & 0x80 != 0;
+                i += 8;
+                continue;
+            }
+        }
 
-    for (i, c) in text.char_indices() {
+        // Scalar step: short tail or non-ASCII window
+        let c = text[i..].chars().next().unwrap();
         let is_word_char = c.is_alphanumeric() || c == '\'';
         if is_word_char {
             if !in_word {
@@ -120,17 +163,49 @@ pub fn chunk_by_tokens(text: &str, max_tokens: usize, overlap_tokens: usize) ->
             word_spans.push((word_start, i));
             in_word = false;
         }
+        i += c.len_utf8();
     }
     if in_word {
         word_spans.push((word_start, text.len()));
     }
 
+    word_spans
+}
+
+/// Compute the byte ranges of token-aware chunks without copying any text.
+///
+/// Each range runs from the first word's start to the last word's end, so
+/// slicing `text` with it yields exactly the chunk `chunk_by_tokens` returns.
+fn token_chunk_spans(
+    text: &str,
+    max_tokens: usize,
+    overlap_tokens: usize,
+) -> Vec<(usize, usize)> {
+    token_windows(text, max_tokens, overlap_tokens)
+        .into_iter()
+        .map(|(start, end, _)| (start, end))
+        .collect()
+}
+
+/// Chunk byte ranges together with the number of words in each chunk.
+fn token_windows(
+    text: &str,
+    max_tokens: usize,
+    overlap_tokens: usize,
+) -> Vec<(usize, usize, usize)> {
+    if text.is_empty() || max_tokens == 0 {
+        return vec![];
+    }
+
+    let word_spans = word_spans(text);
+
     if word_spans.is_empty() {
         return vec![];
     }
 
     if word_spans.len() <= max_tokens {
-        return vec![text.trim().to_string()];
+        let start = text.len() - text.trim_start().len();
+        return vec![(start, text.trim_end().len(), word_spans.len())];
     }
 
     let step = if overlap_tokens >= max_tokens {
@@ -139,16 +214,14 @@ pub fn chunk_by_tokens(text: &str, max_tokens: usize, overlap_tokens: usize) ->
         max_tokens - overlap_tokens
     };
 
-    let mut chunks = Vec::new();
+    let mut windows = Vec::new();
     let mut i = 0;
 
     while i < word_spans.len() {
         let end_idx = (i + max_tokens).min(word_spans.len());
 
-        // Extract original text span from first word start to last word end
-        let chunk_start = word_spans[i].0;
-        let chunk_end = word_spans[end_idx - 1].1;
-        chunks.push(text[chunk_start..chunk_end].to_string());
+        // Original text span from first word start to last word end
+        windows.push((word_spans[i].0, word_spans[end_idx - 1].1, end_idx - i));
 
         if end_idx == word_spans.len() {
             break;
@@ -157,7 +230,37 @@ pub fn chunk_by_tokens(text: &str, max_tokens: usize, overlap_tokens: usize) ->
         i += step;
     }
 
-    chunks
+    windows
+}
+
+/// Token-aware text chunking with overlap.
+///
+/// Splits text into chunks where each chunk contains at most `max_tokens` words.
+/// Maintains `overlap_tokens` words of overlap between adjacent chunks.
+/// Preserves original text formatting (whitespace, punctuation) within each chunk.
+///
+/// This produces chunks that align with how LLMs tokenize text, preventing
+/// mid-word splits and wasted context window space.
+pub fn chunk_by_tokens(text: &str, max_tokens: usize, overlap_tokens: usize) -> Vec<String> {
+    token_chunk_spans(text, max_tokens, overlap_tokens)
+        .into_iter()
+        .map(|(start, end)| text[start..end].to_string())
+        .collect()
+}
+
+/// Like `chunk_by_tokens`, but pairs each chunk with its word count.
+///
+/// The counts fall out of the windowing for free, so callers that need
+/// chunk sizes don't have to re-tokenize every chunk.
+pub fn chunk_by_tokens_with_counts(
+    text: &str,
+    max_tokens: usize,
+    overlap_tokens: usize,
+) -> Vec<(String, usize)> {
+    token_windows(text, max_tokens, overlap_tokens)
+        .into_iter()
+        .map(|(start, end, count)| (text[start..end].to_string(), count))
+        .collect()
 }
 
 #[cfg(test)]
@@ -300,4 +403,95 @@ mod tests {
         let chunks = chunk_by_tokens(text, 10, 2);
         assert_eq!(chunks.len(), 1);
     }
+
+    #[test]
+    fn test_token_chunk_small_text_trimmed() {
+        let text = "  padded   words \n";
+        let spans = token_chunk_spans(text, 10, 2);
+        assert_eq!(spans.len(), 1);
+        let (start, end) = spans[0];
+        assert_eq!(&text[start..end], "padded   words");
+    }
+
+    #[test]
+    fn test_token_chunk_spans_match_chunks() {
+        let text = "The quick brown fox. ".repeat(100);
+        let chunks = chunk_by_tokens(&text, 50, 10);
+        let spans = token_chunk_spans(&text, 50, 10);
+        assert_eq!(chunks.len(), spans.len());
+        for (chunk, &(start, end)) in chunks.iter().zip(&spans) {
+            assert_eq!(chunk, &text[start..end]);
+        }
+    }
+
+    // --- Word boundary scanner tests ---
+
+    /// Char-at-a-time reference for `word_spans`.
+    fn word_spans_scalar(text: &str) -> Vec<(usize, usize)> {
+        let mut spans = Vec::new();
+        let mut start = None;
+        for (i, c) in text.char_indices() {
+            match (c.is_alphanumeric() || c == '\'', start) {
+                (true, None) => start = Some(i),
+                (false, Some(s)) => {
+                    spans.push((s, i));
+                    start = None;
+                }
+                _ => {}
+            }
+        }
+        if let Some(s) = start {
+            spans.push((s, text.len()));
+        }
+        spans
+    }
+
+    #[test]
+    fn test_ascii_word_mask_all_bytes() {
+        for b in 0u8..0x80 {
+            let expected = if (b as char).is_alphanumeric() || b == b'\'' { 0xFF } else { 0 };
+            assert_eq!(ascii_word_mask(u64::from_le_bytes([b; 8])), expected, "byte {:#x}", b);
+        }
+    }
+
+    #[test]
+    fn test_word_spans_match_scalar() {
+        let texts = [
+            String::new(),
+            "word".to_string(),
+            "exactly8".to_string(),
+            "The quick brown fox jumps over the lazy dog. ".repeat(7),
+            "don't stop---it's 42 o'clock!\n\tTabs\r\nand [brackets] {x}@`z`".to_string(),
+            "Café naïve résumé — 東京 tokyo Ωmega, ünïcödé at 8-byte edges".to_string(),
+            "abcdefg\u{e9}hijklmnopq\u{1F600}rstuvwxyz0123456789".to_string(),
+        ];
+        for text in &texts {
+            assert_eq!(word_spans(text), word_spans_scalar(text), "text: {:?}", text);
+        }
+    }
+
+    #[test]
+    fn test_word_spans_every_block_offset() {
+        // Shift a mixed sample through all 8 alignments of the SWAR blocks
+        let sample = "ab c'd, éf 12-gh   ij\u{fc}k ";
+        for pad in 0..8 {
+            let text = format!("{}{}", " ".repeat(pad), sample.repeat(5));
+            assert_eq!(word_spans(&text), word_spans_scalar(&text), "pad {}", pad);
+        }
+    }
+
+    #[test]
+    fn test_token_chunk_counts_match_tokenizer() {
+        let text = "The quick brown fox. Don't stop! ".repeat(60);
+        let with_counts = chunk_by_tokens_with_counts(&text, 50, 10);
+        let chunks = chunk_by_tokens(&text, 50, 10);
+        assert_eq!(with_counts.len(), chunks.len());
+        for ((chunk, count), expected) in with_counts.iter().zip(&chunks) {
+            assert_eq!(chunk, expected);
+            assert_eq!(*count, crate::tokenizer::token_count(chunk));
+        }
+
+        let small = chunk_by_tokens_with_counts("  just three words ", 10, 2);
+        assert_eq!(small, vec![("just three words".to_string(), 3)]);
+    }
 }
@@ -15,6 +15,37 @@ fn extract_pdf_text(path: &str) -> PyResult<String> {
         .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{:#}", e)))
 }
 
+/// Extract all text from a PDF held in memory (e.g. a `bytes` object).
+///
+/// Same parser and normalization as `extract_pdf_text`, for PDFs that were
+/// generated or downloaded and need not be written to disk first.
+/// The GIL is released while parsing.
+#[pyfunction]
+fn extract_pdf_text_bytes(py: Python<'_>, data: &[u8]) -> PyResult<String> {
+    py.allow_threads(|| pdf::extract_text_from_bytes(data))
+        .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{:#}", e)))
+}
+
+/// Extract text from a PDF and split it into token-aware chunks in one call.
+///
+/// The extracted document stays in a Rust `String` and only the chunks are
+/// copied into Python, so the full text never crosses the FFI boundary.
+/// The GIL is released while parsing and chunking.
+#[pyfunction]
+#[pyo3(signature = (path, max_tokens=256, overlap_tokens=32))]
+fn extract_and_chunk(
+    py: Python<'_>,
+    path: &str,
+    max_tokens: usize,
+    overlap_tokens: usize,
+) -> PyResult<Vec<String>> {
+    py.allow_threads(|| -> anyhow::Result<Vec<String>> {
+        let text = pdf::extract_text(path)?;
+        Ok(chunker::chunk_by_tokens(&text, max_tokens, overlap_tokens))
+    })
+    .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(format!("{:#}", e)))
+}
+
 /// Split text into overlapping chunks using a parallel sliding window algorithm.
 ///
 /// Uses Rayon's work-stealing scheduler to extract chunks across all CPU cores.
@@ -44,6 +75,21 @@ fn chunk_by_tokens(text: &str, max_tokens: usize, overlap_tokens: usize) -> Vec<
     chunker::chunk_by_tokens(text, max_tokens, overlap_tokens)
 }
 
+/// Token-aware chunking that also returns each chunk's token count.
+///
+/// Returns `(chunk, n_tokens)` tuples with the same chunks as
+/// `chunk_by_tokens`; the counts come from the chunker itself, so nothing
+/// is tokenized twice.
+#[pyfunction]
+#[pyo3(signature = (text, max_tokens=256, overlap_tokens=32))]
+fn chunk_by_tokens_with_counts(
+    text: &str,
+    max_tokens: usize,
+    overlap_tokens: usize,
+) -> Vec<(String, usize)> {
+    chunker::chunk_by_tokens_with_counts(text, max_tokens, overlap_tokens)
+}
+
 /// Tokenize text into lowercase word tokens.
 ///
 /// Splits on non-alphanumeric characters (preserving apostrophes).
@@ -62,16 +108,21 @@ fn token_count(text: &str) -> usize {
 ///
 /// Exposes:
 ///   - extract_pdf_text: PDF parsing with memory-mapped I/O
+///   - extract_pdf_text_bytes: PDF parsing from an in-memory buffer
+///   - extract_and_chunk: PDF parsing + token-aware chunking in one pass
 ///   - chunk_text / chunk_text_parallel: Character-based chunking
-///   - chunk_by_tokens: Token-aware chunking
+///   - chunk_by_tokens / chunk_by_tokens_with_counts: Token-aware chunking
 ///   - tokenize / token_count: Word-level tokenization
 ///   - BM25Index: Keyword search index
 #[pymodule]
 fn rusty_rag_core(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(extract_pdf_text, m)?)?;
+    m.add_function(wrap_pyfunction!(extract_pdf_text_bytes, m)?)?;
+    m.add_function(wrap_pyfunction!(extract_and_chunk, m)?)?;
     m.add_function(wrap_pyfunction!(chunk_text_parallel, m)?)?;
     m.add_function(wrap_pyfunction!(chunk_text, m)?)?;
     m.add_function(wrap_pyfunction!(chunk_by_tokens, m)?)?;
+    m.add_function(wrap_pyfunction!(chunk_by_tokens_with_counts, m)?)?;
     m.add_function(wrap_pyfunction!(tokenize, m)?)?;
     m.add_function(wrap_pyfunction!(token_count, m)?)?;
     m.add_class::<bm25::BM25Index>()?;
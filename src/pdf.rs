@@ -3,6 +3,19 @@ use memmap2::Mmap;
 use std::fs::File;
 use std::path::Path;
 
+/// How far into the file the `%PDF-` header may start. The spec puts it at
+/// byte 0, but readers tolerate leading junk within the first 1 KiB.
+const HEADER_SEARCH_LEN: usize = 1024;
+
+/// Whether `data` carries a `%PDF-` header near its start.
+///
+/// A cheap check that rejects non-PDF input before the parser sees it.
+fn has_pdf_header(data: &[u8]) -> bool {
+    data[..data.len().min(HEADER_SEARCH_LEN)]
+        .windows(5)
+        .any(|w| w == b"%PDF-")
+}
+
 /// Extracts all text content from a PDF file at the given path.
 ///
 /// Uses memory-mapped file I/O to handle datasets larger than available RAM.
@@ -31,8 +44,25 @@ pub fn extract_text(path: &str) -> Result<String> {
     let mmap = unsafe { Mmap::map(&file) }
         .with_context(|| format!("Failed to memory-map file: {}", path))?;
 
-    let text = pdf_extract::extract_text_from_mem(&mmap[..])
-        .with_context(|| format!("Failed to extract text from PDF: {}", path))?;
+    // Only the first page of the mapping is touched if the header is missing
+    extract_from_mem(&mmap, path)
+}
+
+/// Extracts all text content from a PDF that is already in memory.
+///
+/// Same parsing and normalization as `extract_text`, without a file.
+pub fn extract_text_from_bytes(data: &[u8]) -> Result<String> {
+    extract_from_mem(data, "<bytes>")
+}
+
+/// Parse PDF bytes and normalize the text; `source` names them in errors.
+fn extract_from_mem(data: &[u8], source: &str) -> Result<String> {
+    if !has_pdf_header(data) {
+        anyhow::bail!("File is not a PDF (missing %PDF- header): {}", source);
+    }
+
+    let text = pdf_extract::extract_text_from_mem(data)
+        .with_context(|| format!("Failed to extract text from PDF: {}", source))?;
 
     // Normalize whitespace: collapse multiple spaces/newlines
     let cleaned = text
@@ -45,9 +75,47 @@ pub fn extract_text(path: &str) -> Result<String> {
     if cleaned.is_empty() {
         anyhow::bail!(
             "No text could be extracted from the PDF. It may be image-based or encrypted: {}",
-            path
+            source
         );
     }
 
     Ok(cleaned)
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_pdf_header_detected() {
+        assert!(has_pdf_header(b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n1 0 obj"));
+        // Leading junk before the header is tolerated
+        assert!(has_pdf_header(b"\r\n\r\n%PDF-1.4\n"));
+    }
+
+    #[test]
+    fn test_non_pdf_rejected() {
+        assert!(!has_pdf_header(b""));
+        assert!(!has_pdf_header(b"%PDF"));
+        assert!(!has_pdf_header(b"# README\n\nNot a PDF at all."));
+
+        let mut late = vec![b' '; HEADER_SEARCH_LEN];
+        late.extend_from_slice(b"%PDF-1.7");
+        assert!(!has_pdf_header(&late));
+    }
+
+    #[test]
+    fn test_extract_rejects_misnamed_file() {
+        let path = std::env::temp_dir().join(format!("rusty_rag_fake_{}.pdf", std::process::id()));
+        std::fs::write(&path, "<html>definitely not a pdf</html>").unwrap();
+        let err = extract_text(path.to_str().unwrap()).unwrap_err();
+        std::fs::remove_file(&path).unwrap();
+        assert!(format!("{:#}", err).contains("missing %PDF- header"));
+    }
+
+    #[test]
+    fn test_extract_bytes_rejects_non_pdf() {
+        let err = extract_text_from_bytes(b"PK\x03\x04 a zip file").unwrap_err();
+        assert!(format!("{:#}", err).ends_with("missing %PDF- header): <bytes>"));
+    }
+}
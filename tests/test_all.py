@@ -5,7 +5,8 @@ RustyRAG Full Test Script
 Generates a sample PDF and tests the entire pipeline:
   1. Rust core functions (tokenizer, chunker, BM25) — no services needed
   2. PDF extraction — no services needed
-  3. Full pipeline (ingest + query) — needs Ollama + Qdrant running
+  3. Local chunk store and rank fusion — no services needed
+  4. Full pipeline (ingest + query) — needs Ollama + Qdrant running
 
 Usage:
     pip install fpdf2           # one-time, for generating the sample PDF
@@ -13,11 +14,35 @@ Usage:
 """
 
 import sys
+import json
 import os
+import re
+import tempfile
 import time
 import textwrap
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 
+try:
+    from rusty_rag import (
+        tokenize,
+        token_count,
+        chunk_text,
+        chunk_text_parallel,
+        chunk_by_tokens,
+        chunk_by_tokens_with_counts,
+        BM25Index,
+        extract_pdf_text,
+        extract_pdf_text_bytes,
+        extract_and_chunk,
+    )
+
+    RUSTY_RAG_AVAILABLE = True
+except ImportError:
+    RUSTY_RAG_AVAILABLE = False
+
 # ── Color helpers for terminal output ──
 
 GREEN = "\033[92m"
@@ -28,6 +53,17 @@ BOLD = "\033[1m"
 DIM = "\033[2m"
 RESET = "\033[0m"
 
+if not sys.stdout.isatty():
+    # Piped to a file or CI log: plain text, no escape codes
+    GREEN = RED = YELLOW = CYAN = BOLD = DIM = RESET = ""
+
+_OK_PREFIX = f"  {GREEN}✓{RESET} "
+_FAIL_PREFIX = f"  {RED}✗{RESET} "
+_FAIL_DETAIL_PREFIX = f"    {RED}"
+_SKIP_PREFIX = f"  {YELLOW}○{RESET} "
+_DIM_OPEN = f"  {DIM}"
+_DIM_CLOSE = RESET
+
 passed = 0
 failed = 0
 skipped = 0
@@ -36,20 +72,20 @@ skipped = 0
 def ok(name: str, detail: str = ""):
     global passed
     passed += 1
-    print(f"  {GREEN}✓{RESET} {name}" + (f"  {DIM}{detail}{RESET}" if detail else ""))
+    print(_OK_PREFIX + name + (_DIM_OPEN + detail + _DIM_CLOSE if detail else ""))
 
 
 def fail(name: str, error: str):
     global failed
     failed += 1
-    print(f"  {RED}✗{RESET} {name}")
-    print(f"    {RED}{error}{RESET}")
+    print(_FAIL_PREFIX + name)
+    print(_FAIL_DETAIL_PREFIX + error + RESET)
 
 
 def skip(name: str, reason: str):
     global skipped
     skipped += 1
-    print(f"  {YELLOW}○{RESET} {name}  {DIM}({reason}){RESET}")
+    print(_SKIP_PREFIX + name + _DIM_OPEN + "(" + reason + ")" + _DIM_CLOSE)
 
 
 def section(title: str):
@@ -154,8 +190,31 @@ SAMPLE_TEXT = textwrap.dedent("""\
 """)
 
 
-def generate_sample_pdf():
-    """Generate a sample PDF for testing."""
+# Short, unindented, non-blank lines are rendered as headings
+_HEADING_RE = re.compile(r"\S.{0,78}")
+
+# (is_heading, text) for each line of SAMPLE_TEXT, classified once at import
+SAMPLE_LINES = [
+    (True, line.strip()) if _HEADING_RE.fullmatch(line) else (False, line)
+    for line in SAMPLE_TEXT.split("\n")
+]
+
+# Chunker fixtures, built once
+_WORD_5K = "word " * 1000  # 5000 chars
+_FOX_500W = "The quick brown fox. " * 100  # ~500 words
+_WORD_1M = "word " * 200_000  # 1 MB, large enough for Rayon to pay off
+
+
+def generate_sample_pdf() -> tuple[Path, bytes]:
+    """Generate a sample PDF for testing, returning its path and contents.
+
+    The PDF is only rebuilt when this script is newer than it, since its
+    content is fully determined by SAMPLE_TEXT. A fresh render hands back
+    the bytes it just wrote, so they don't have to be read back from disk.
+    """
+    if SAMPLE_PDF.exists() and SAMPLE_PDF.stat().st_mtime >= Path(__file__).stat().st_mtime:
+        return SAMPLE_PDF, SAMPLE_PDF.read_bytes()
+
     try:
         from fpdf import FPDF
     except ImportError:
@@ -170,17 +229,20 @@ def generate_sample_pdf():
     pdf.add_page()
     pdf.set_font("Helvetica", size=11)
 
-    for line in SAMPLE_TEXT.split("\n"):
-        if line.strip() and not line.startswith(" ") and len(line.strip()) < 80:
-            # Looks like a heading
+    # One multi_cell per run of body lines rather than one call per line
+    for is_heading, run in groupby(SAMPLE_LINES, key=itemgetter(0)):
+        lines = [line for _, line in run]
+        if is_heading:
             pdf.set_font("Helvetica", "B", size=13)
-            pdf.cell(0, 10, line.strip(), new_x="LMARGIN", new_y="NEXT")
+            for line in lines:
+                pdf.cell(0, 10, line, new_x="LMARGIN", new_y="NEXT")
             pdf.set_font("Helvetica", size=11)
         else:
-            pdf.multi_cell(0, 6, line)
+            pdf.multi_cell(0, 6, "\n".join(lines), new_x="LMARGIN", new_y="NEXT")
 
-    pdf.output(str(SAMPLE_PDF))
-    return SAMPLE_PDF
+    data = bytes(pdf.output())
+    SAMPLE_PDF.write_bytes(data)
+    return SAMPLE_PDF, data
 
 
 # ═══════════════════════════════════════════════════
@@ -190,16 +252,7 @@ def generate_sample_pdf():
 def test_rust_core():
     section("Rust Core Functions (no services needed)")
 
-    try:
-        from rusty_rag import (
-            tokenize,
-            token_count,
-            chunk_text,
-            chunk_text_parallel,
-            chunk_by_tokens,
-            BM25Index,
-        )
-    except ImportError:
+    if not RUSTY_RAG_AVAILABLE:
         fail("Import rusty_rag", "Module not found. Run: maturin develop --release")
         return False
 
@@ -215,25 +268,40 @@ def test_rust_core():
     ok("token_count()", f"{count} tokens")
 
     # ── Character chunking ──
-    text = "word " * 1000  # 5000 chars
-    chunks = chunk_text(text, 500, 50)
+    chunks = chunk_text(_WORD_5K, 500, 50)
     assert len(chunks) > 1
     ok("chunk_text()", f"{len(chunks)} chunks from 5000 chars")
 
-    parallel = chunk_text_parallel(text, 500, 50)
+    parallel = chunk_text_parallel(_WORD_5K, 500, 50)
     assert chunks == parallel
     ok("chunk_text_parallel()", "matches sequential output")
 
+    mb = len(_WORD_1M) / 1e6
+    start = time.perf_counter()
+    large = chunk_text(_WORD_1M, 2000, 200)
+    seq_s = time.perf_counter() - start
+    start = time.perf_counter()
+    large_parallel = chunk_text_parallel(_WORD_1M, 2000, 200)
+    par_s = time.perf_counter() - start
+    assert large == large_parallel
+    ok(
+        "chunk_text_parallel() on 1 MB",
+        f"{len(large)} chunks, sequential {mb / seq_s:.0f} MB/s · "
+        f"parallel {mb / par_s:.0f} MB/s",
+    )
+
     # ── Token-aware chunking ──
-    text2 = "The quick brown fox. " * 100  # ~500 words
-    token_chunks = chunk_by_tokens(text2, 50, 10)
+    token_chunks = chunk_by_tokens(_FOX_500W, 50, 10)
     assert len(token_chunks) > 1
-    # Verify each chunk has approximately the right number of words
-    for i, chunk in enumerate(token_chunks[:-1]):  # last chunk may be shorter
-        wc = token_count(chunk)
-        assert wc <= 50, f"Chunk {i} has {wc} tokens, expected ≤50"
     ok("chunk_by_tokens()", f"{len(token_chunks)} token-aware chunks")
 
+    # Verify each chunk's size from the counts the chunker reports
+    with_counts = chunk_by_tokens_with_counts(_FOX_500W, 50, 10)
+    assert [chunk for chunk, _ in with_counts] == token_chunks
+    for i, (_, wc) in enumerate(with_counts):
+        assert wc <= 50, f"Chunk {i} has {wc} tokens, expected ≤50"
+    ok("chunk_by_tokens_with_counts()", f"{max(wc for _, wc in with_counts)} tokens max")
+
     # ── BM25 ──
     docs = [
         "machine learning and deep neural networks",
@@ -249,10 +317,11 @@ def test_rust_core():
     assert top_idx in [0, 2, 4], f"Expected ML doc, got index {top_idx}"
     ok("BM25Index.search()", f"top result: doc[{top_idx}] (score={results[0][1]:.3f})")
 
-    # BM25 should NOT match cooking/gardening
-    result_indices = {idx for idx, _ in results}
-    assert 1 not in result_indices, "Cooking doc should not match ML query"
-    assert 3 not in result_indices, "Gardening doc should not match ML query"
+    # BM25 should NOT match cooking (1) or gardening (3)
+    irrelevant = {1, 3}
+    assert not any(idx in irrelevant for idx, _ in results), (
+        f"Cooking/gardening docs should not match ML query, got {results}"
+    )
     ok("BM25 relevance", "irrelevant docs correctly excluded")
 
     # Empty query
@@ -271,20 +340,22 @@ def test_rust_core():
 def test_pdf_extraction():
     section("PDF Extraction (no services needed)")
 
-    try:
-        from rusty_rag import extract_pdf_text
-    except ImportError:
+    if not RUSTY_RAG_AVAILABLE:
         fail("Import", "rusty_rag not installed")
         return False
 
     # Generate sample PDF
-    pdf_path = generate_sample_pdf()
+    pdf_path, pdf_bytes = generate_sample_pdf()
     ok("Generate sample PDF", str(pdf_path))
 
-    # Extract text
-    text = extract_pdf_text(str(pdf_path))
+    # Extract text straight from the in-memory PDF
+    text = extract_pdf_text_bytes(pdf_bytes)
     assert len(text) > 100, f"Extracted too little text: {len(text)} chars"
-    ok("extract_pdf_text()", f"{len(text):,} chars extracted")
+    ok("extract_pdf_text_bytes()", f"{len(text):,} chars extracted")
+
+    # The file path (memory-mapped) must yield the same text
+    assert extract_pdf_text(str(pdf_path)) == text, "extract_pdf_text() differs from bytes path"
+    ok("extract_pdf_text()", "matches in-memory extraction")
 
     # Verify key content is present
     text_lower = text.lower()
@@ -294,11 +365,15 @@ def test_pdf_extraction():
     ok("Content verification", "key terms found in extracted text")
 
     # Test chunk pipeline on extracted text
-    from rusty_rag import chunk_by_tokens, token_count
     chunks = chunk_by_tokens(text, 256, 32)
     total_tokens = token_count(text)
     ok("Full PDF → chunk pipeline", f"{total_tokens} tokens → {len(chunks)} chunks")
 
+    # The fused call must match the two-step extract → chunk path
+    fused = extract_and_chunk(str(pdf_path), 256, 32)
+    assert fused == chunks, "extract_and_chunk() differs from extract + chunk_by_tokens"
+    ok("extract_and_chunk()", f"{len(fused)} chunks, matches two-step path")
+
     # Test error handling
     try:
         extract_pdf_text("nonexistent_file.pdf")
@@ -312,40 +387,169 @@ def test_pdf_extraction():
     except RuntimeError:
         ok("Error handling", "non-PDF file raises RuntimeError")
 
+    try:
+        extract_pdf_text_bytes(b"plain text, no PDF header")
+        fail("Error handling", "Should have raised for non-PDF bytes")
+    except RuntimeError:
+        ok("Error handling", "non-PDF bytes raise RuntimeError")
+
+    return True
+
+
+# ═══════════════════════════════════════════════════
+#  STEP 4: Test local chunk store (no services needed)
+# ═══════════════════════════════════════════════════
+
+def test_local_store():
+    section("Chunk Store + Fusion (no services needed)")
+
+    if not RUSTY_RAG_AVAILABLE:
+        fail("Import", "rusty_rag not installed")
+        return False
+
+    from rusty_rag import rag
+    from rusty_rag.store import ChunkStore
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+
+        # ── Round trip ──
+        chunks = ["alpha", "", "βeta — unicode", "gamma " * 100]
+        store = ChunkStore(tmp / "store")
+        assert len(store) == 0
+        store.append(chunks[:2])
+        store.append(chunks[2:])
+        reopened = ChunkStore(tmp / "store")
+        assert list(reopened) == chunks, f"Got: {list(reopened)}"
+        assert reopened[2] == chunks[2]
+        try:
+            reopened[len(chunks)]
+        except IndexError:
+            pass
+        else:
+            raise AssertionError("out-of-range chunk id did not raise")
+        ok("ChunkStore round trip", f"{len(chunks)} chunks over 2 appends, reopened")
+
+        # ── Torn append recovery ──
+        # An append that died after writing texts but before (or while)
+        # writing offsets leaves stray bytes in both files
+        with open(store.texts_path, "ab") as f:
+            f.write(b"orphan text")
+        with open(store.offsets_path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        torn = ChunkStore(tmp / "store")
+        assert list(torn) == chunks, "partial offset entry was not ignored"
+        torn.append(["delta"])
+        recovered = ChunkStore(tmp / "store")
+        assert list(recovered) == chunks + ["delta"], f"Got: {list(recovered)}"
+        expected_size = len("".join(chunks + ["delta"]).encode())
+        assert store.texts_path.stat().st_size == expected_size, "orphan text kept"
+        ok("ChunkStore torn append", "stray bytes ignored, then truncated on append")
+
+        # ── Source ranges (re-ingest) ──
+        recovered.set_source("doc.pdf", range(0, 4))
+        assert recovered.ids_of("doc.pdf", chunks) == range(0, 4)
+        assert recovered.ids_of("doc.pdf", chunks[:3]) is None
+        recovered.append(["alpha v2"])
+        recovered.set_source("doc.pdf", range(5, 6))
+        reopened = ChunkStore(tmp / "store")
+        live = [i for i, alive in enumerate(reopened.live_mask()) if alive]
+        assert live == [5], f"Got live ids: {live}"
+        ok("ChunkStore sources", "unchanged chunks reuse ids, new range tombstones old")
+
+        # ── Legacy chunks.json cleanup ──
+        class RecordingClient:
+            def __init__(self):
+                self.deletes = []
+
+            def delete(self, **kwargs):
+                self.deletes.append(kwargs)
+
+        saved = rag.LEGACY_JSON_CACHE
+        rag.LEGACY_JSON_CACHE = tmp / "chunks.json"
+        try:
+            rag.LEGACY_JSON_CACHE.write_text(json.dumps(["old chunk"]), encoding="utf-8")
+            client = RecordingClient()
+            rag._drop_legacy_cache(client)
+            assert not rag.LEGACY_JSON_CACHE.exists(), "legacy cache not removed"
+            assert len(client.deletes) == 1, f"Got: {client.deletes}"
+            (condition,) = client.deletes[0]["points_selector"].filter.must
+            assert condition.is_empty.key == "chunk_id", f"Got: {condition}"
+            rag._drop_legacy_cache(client)
+            assert len(client.deletes) == 1, "cleanup ran twice"
+        finally:
+            rag.LEGACY_JSON_CACHE = saved
+        ok("Legacy chunks.json cleanup", "cache and chunk_id-less points removed once")
+
+    # ── Reciprocal Rank Fusion ──
+    # 3 is in both lists; 5 and 7 lead their own lists; 9 is ranked 3rd
+    fused = rag._reciprocal_rank_fusion([5, 3, 9], [3, 7], top_k=3)
+    assert [chunk_id for chunk_id, _ in fused] == [3, 5, 7], f"Got: {fused}"
+    assert abs(fused[0][1] - (1 / 62 + 1 / 61)) < 1e-6
+    big = rag._reciprocal_rank_fusion([10**12, 4], [], top_k=3)
+    assert [chunk_id for chunk_id, _ in big] == [10**12, 4], f"Got: {big}"
+    assert rag._reciprocal_rank_fusion([], [], top_k=3) == []
+    ok("Reciprocal Rank Fusion", "shared hits first, then by rank")
+
     return True
 
 
 # ═══════════════════════════════════════════════════
-#  STEP 4: Test full pipeline (needs Ollama + Qdrant)
+#  STEP 5: Test full pipeline (needs Ollama + Qdrant)
 # ═══════════════════════════════════════════════════
 
+PROBE_TIMEOUT = 5  # seconds to wait for each service health check
+WARMUP_K = 1  # chunks stored before the mid-ingest retrieval starts
+# The sample PDF is only a few chunks, so ingest it a chunk per batch:
+# with the default batch size the first progress report is the last one,
+# and the mid-ingest retrieval would have nothing left to overlap
+TEST_INGEST_BATCH = 1
+
+
+def _probe_qdrant():
+    from qdrant_client import QdrantClient
+
+    # A throwaway client: the shared one from create_client() has no timeout
+    url = os.getenv("QDRANT_URL", "http://localhost:6333")
+    QdrantClient(url=url, timeout=PROBE_TIMEOUT).get_collections()
+
+
+def _probe_ollama():
+    import ollama
+
+    return ollama.Client(timeout=PROBE_TIMEOUT).list()
+
+
 def test_full_pipeline():
     section("Full Pipeline (requires Ollama + Qdrant)")
 
-    # Check if Qdrant is running
+    # Probe Qdrant and Ollama at the same time; the Ollama model list
+    # doubles as its probe. Each probe's own requests time out after
+    # PROBE_TIMEOUT, so a hung service neither stalls the checks below
+    # nor keeps the worker thread (and the interpreter) alive at exit.
+    pool = ThreadPoolExecutor(max_workers=2)
+    qdrant_probe = pool.submit(_probe_qdrant)
+    ollama_probe = pool.submit(_probe_ollama)
+    pool.shutdown(wait=False)
+
     try:
-        from rusty_rag.db import create_client
-        client = create_client()
-        client.get_collections()
+        qdrant_probe.result(timeout=PROBE_TIMEOUT)
         ok("Qdrant connection", "connected to localhost:6333")
     except Exception as e:
-        skip("Qdrant connection", f"not running — {e}")
+        skip("Qdrant connection", f"not running — {str(e) or 'timed out'}")
         skip("Full pipeline", "skipped (Qdrant unavailable)")
         return False
 
-    # Check if Ollama is running
     try:
-        import ollama
-        ollama.list()
+        models = ollama_probe.result(timeout=PROBE_TIMEOUT)
         ok("Ollama connection", "running")
     except Exception as e:
-        skip("Ollama connection", f"not running — {e}")
+        skip("Ollama connection", f"not running — {str(e) or 'timed out'}")
         skip("Full pipeline", "skipped (Ollama unavailable)")
         return False
 
     # Check if models are pulled
     try:
-        models = ollama.list()
         model_names = [m.model.split(":")[0] for m in models.models]
         emb_model = os.getenv("EMBEDDING_MODEL", "all-minilm")
         llm_model = os.getenv("COMPLETION_MODEL", "llama3.2")
@@ -375,54 +579,114 @@ def test_full_pipeline():
     print(f"  {CYAN}Running ingestion pipeline...{RESET}")
     print()
 
-    from rusty_rag.rag import ingest
+    from rusty_rag.db import create_client
+    from rusty_rag.rag import ingest_stream, query, retrieve, set_verbose
+
+    # One client for the ingest and every query below
+    client = create_client()
+
+    set_verbose(True)
+
+    test_queries = [
+        ("What datasets were used?", ["mmlu", "humaneval", "triviaqa"]),
+        ("What is the hybrid retrieval approach?", ["vector", "bm25", "fusion"]),
+        ("How much did memory-mapped I/O reduce RAM usage?", ["83", "340", "memory"]),
+    ]
 
-    pdf_path = str(SAMPLE_DIR / "test_paper.pdf")
-    start = time.time()
+    pdf_path = str(SAMPLE_PDF)
+    start = time.perf_counter_ns()
 
+    # Retrieve while the rest of the ingest runs: a new file's chunks are
+    # searchable per batch, so once WARMUP_K are stored the test questions
+    # already find context (and their embeddings are memoized for below)
+    pool = ThreadPoolExecutor(max_workers=1)
+    warmup = None
+    warmup_at = n_stored = 0
     try:
-        ingest(pdf_path)
-        elapsed = time.time() - start
+        for n_stored in ingest_stream(
+            pdf_path, client=client, batch_size=TEST_INGEST_BATCH
+        ):
+            if warmup is None and n_stored >= WARMUP_K:
+                warmup = pool.submit(
+                    lambda: [retrieve(q, client) for q, _ in test_queries]
+                )
+                warmup_at = n_stored
+        elapsed = (time.perf_counter_ns() - start) / 1e9
         ok("Ingest pipeline", f"completed in {elapsed:.1f}s")
     except Exception as e:
         fail("Ingest pipeline", str(e))
         return False
+    finally:
+        pool.shutdown(wait=True)
+
+    if warmup is not None:
+        try:
+            found = sum(len(hits) for hits in warmup.result())
+            when = (
+                f"started with {warmup_at} of {n_stored} chunks stored"
+                if warmup_at < n_stored
+                else "started after the last batch"
+            )
+            if found:
+                ok("Mid-ingest retrieval", f"{found} chunks retrieved, {when}")
+            else:
+                fail("Mid-ingest retrieval", f"no context found, {when}")
+        except Exception as e:
+            fail("Mid-ingest retrieval", str(e))
 
     # Run queries
     print()
     print(f"  {CYAN}Running query pipeline...{RESET}")
     print()
 
-    from rusty_rag.rag import query
-
-    test_queries = [
-        ("What datasets were used?", ["mmlu", "humaneval", "triviaqa"]),
-        ("What is the hybrid retrieval approach?", ["vector", "bm25", "fusion"]),
-        ("How much did memory-mapped I/O reduce RAM usage?", ["83", "340", "memory"]),
-    ]
+    def timed_query(question: str) -> tuple[str, float]:
+        start = time.perf_counter_ns()
+        response = query(question, client=client)
+        return response, (time.perf_counter_ns() - start) / 1e9
 
-    for question, expected_terms in test_queries:
+    def check(question: str, expected_terms: list[str], future) -> bool:
+        """Report the outcome of one submitted query; True if it passed."""
         try:
-            start = time.time()
-            response = query(question)
-            elapsed = time.time() - start
-
-            response_lower = response.lower()
-            found = [t for t in expected_terms if t in response_lower]
-
-            if found:
-                ok(
-                    f'Query: "{question[:50]}"',
-                    f"{elapsed:.1f}s, found: {', '.join(found)}",
-                )
-            else:
-                fail(
-                    f'Query: "{question[:50]}"',
-                    f"Response didn't contain expected terms: {expected_terms}",
-                )
-                print(f"    {DIM}Response: {response[:200]}...{RESET}")
+            response, elapsed = future.result()
         except Exception as e:
             fail(f'Query: "{question[:50]}"', str(e))
+            return False
+
+        response_lower = response.lower()
+        found = [t for t in expected_terms if t in response_lower]
+
+        if found:
+            ok(
+                f'Query: "{question[:50]}"',
+                f"{elapsed:.1f}s, found: {', '.join(found)}",
+            )
+            return True
+
+        fail(
+            f'Query: "{question[:50]}"',
+            f"Response didn't contain expected terms: {expected_terms}",
+        )
+        print(f"    {DIM}Response: {response[:200]}...{RESET}")
+        return False
+
+    # The first query is a smoke test: if it fails, ingestion or retrieval is
+    # broken and the rest would only burn LLM time. The remaining queries are
+    # independent, so they run concurrently; per-query progress output is
+    # muted since it would interleave across threads
+    set_verbose(False)
+    (smoke_question, smoke_terms), *rest = test_queries
+    with ThreadPoolExecutor(max_workers=len(test_queries)) as pool:
+        if not check(smoke_question, smoke_terms, pool.submit(timed_query, smoke_question)):
+            for question, _ in rest:
+                skip(f'Query: "{question[:50]}"', "smoke query failed")
+            return False
+
+        futures = {
+            pool.submit(timed_query, question): (question, expected_terms)
+            for question, expected_terms in rest
+        }
+        for future in as_completed(futures):
+            check(*futures[future], future)
 
     return True
 
@@ -439,9 +703,10 @@ def main():
     # Always run these (no external deps needed)
     core_ok = test_rust_core()
     pdf_ok = test_pdf_extraction()
+    store_ok = test_local_store()
 
     # Only run if services are available
-    if core_ok and pdf_ok:
+    if core_ok and pdf_ok and store_ok:
         test_full_pipeline()
 
     # Summary